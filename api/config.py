@@ -2,14 +2,16 @@
 Configuration for the MFT Eval Platform API.
 
 Endpoints, model names, and environment settings.
-Loads from .env file if present (via python-dotenv).
+Loads from .env file if present (via python-dotenv). Set MFT_SKIP_DOTENV=1
+in deployments that inject env vars directly to skip the .env lookup.
 """
 
 import os
 
-from dotenv import load_dotenv
+if os.environ.get("MFT_SKIP_DOTENV") != "1":
+    from dotenv import load_dotenv
 
-load_dotenv()
+    load_dotenv(override=False)
 
 from .system_prompt import SYSTEM_PROMPT as _DEFAULT_SYSTEM_PROMPT
 
@@ -51,6 +53,10 @@ ANTHROPIC_DIRECT_BASE_URL = "https://api.anthropic.com"
 # --- API Configuration ---
 API_HOST = os.environ.get("MFT_API_HOST", "0.0.0.0")
 API_PORT = int(os.environ.get("MFT_API_PORT", "8000"))
+# Auto-reload on code changes (dev only — it spawns a file-watcher process).
+# uvicorn ignores API_WORKERS while reload is on.
+API_RELOAD = os.environ.get("MFT_API_RELOAD", "0") == "1"
+API_WORKERS = int(os.environ.get("MFT_API_WORKERS", "1"))
 
 # CORS origins (React dev server + GitHub Pages)
 CORS_ORIGINS = [
@@ -66,5 +72,28 @@ SYSTEM_PROMPT = os.environ.get("MFT_SYSTEM_PROMPT", _DEFAULT_SYSTEM_PROMPT)
 # Max tokens for LLM responses
 MAX_TOKENS = int(os.environ.get("MFT_MAX_TOKENS", "4096"))
 
-# Request timeout (seconds) — 3P models via Llama API don't support streaming
+# Stream chat/completions responses over SSE (llama_native and openai only;
+# 3P models behind the Llama API Anthropic passthrough don't support it)
+LLM_STREAM = os.environ.get("MFT_LLM_STREAM", "0") == "1"
+
+# Mark the static system prompt as an Anthropic prompt-cache breakpoint
+# (cache_control). OpenAI-format providers cache stable prefixes automatically.
+PROMPT_CACHE = os.environ.get("MFT_PROMPT_CACHE", "1") == "1"
+
+# Send the response model's JSON schema so the provider constrains output to
+# it (Anthropic: forced tool call; OpenAI/Llama: response_format json_schema).
+# Off by default: not every gateway/model accepts tools or response_format,
+# so turn it on only after checking the configured endpoint does.
+STRUCTURED_OUTPUT = os.environ.get("MFT_STRUCTURED_OUTPUT", "0") == "1"
+
+# Request timeout (seconds) — 3P models via Llama API don't support streaming.
+# Applied to response reads only; connect/write get their own shorter budgets
+# so a slow handshake doesn't eat into generation time.
 REQUEST_TIMEOUT = int(os.environ.get("MFT_REQUEST_TIMEOUT", "120"))
+CONNECT_TIMEOUT = float(os.environ.get("MFT_CONNECT_TIMEOUT", "10"))
+WRITE_TIMEOUT = float(os.environ.get("MFT_WRITE_TIMEOUT", "30"))
+
+# Retries for transient LLM failures (connect errors, 429, 5xx) with
+# jittered exponential backoff; Retry-After is honored up to the cap
+LLM_MAX_RETRIES = int(os.environ.get("MFT_LLM_MAX_RETRIES", "3"))
+LLM_RETRY_MAX_DELAY = float(os.environ.get("MFT_LLM_RETRY_MAX_DELAY", "8"))
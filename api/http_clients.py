@@ -0,0 +1,70 @@
+"""
+Shared HTTP client for outbound LLM calls.
+
+A single pooled httpx.AsyncClient is reused across requests so repeated
+calls to the same LLM origin skip the TCP + TLS handshake. The client is
+created on server startup and closed on shutdown. HTTP/2 is negotiated
+when the `h2` package is available (`httpx[http2]`), letting concurrent
+calls to the same origin multiplex over one TLS connection.
+
+httpx connections are bound to the event loop that opened them, so one
+client is kept per loop. Callers that spin up their own loop (e.g.
+LLMJudgeScorer via asyncio.run) get a client scoped to that loop instead
+of borrowing the server's connections.
+"""
+import asyncio
+import importlib.util
+import logging
+import weakref
+
+import httpx
+
+from .config import CONNECT_TIMEOUT, LLM_MAX_RETRIES, REQUEST_TIMEOUT, WRITE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# httpx raises at client construction if http2=True without h2 installed,
+# so fall back to HTTP/1.1 rather than failing startup.
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Long read budget for LLM generation; pool=None so bursts of concurrent
+# requests wait for a free connection instead of raising PoolTimeout.
+_TIMEOUT = httpx.Timeout(
+    connect=CONNECT_TIMEOUT,
+    read=REQUEST_TIMEOUT,
+    write=WRITE_TIMEOUT,
+    pool=None,
+)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_client() -> httpx.AsyncClient:
+    # Connection-level retries (failed connects) live on the transport;
+    # HTTP-level 429/5xx retries are handled by the caller in llm.py.
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        retries=LLM_MAX_RETRIES,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=_TIMEOUT)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _new_client()
+        _clients[loop] = client
+        logger.debug(f"Created LLM HTTP client (http2={HTTP2_ENABLED})")
+    return client
+
+
+async def close_client() -> None:
+    """Close the pooled client for the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -10,11 +10,17 @@ Supports four providers:
 The native Llama API and OpenAI use OpenAI's chat/completions format.
 The passthrough and direct Anthropic use the Anthropic Messages API format.
 """
-import json
+import asyncio
 import logging
-from typing import Optional
+import random
+import re
+from functools import cache, partial
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 import httpx
+import orjson
+from pydantic import BaseModel
 
 from .config import (
     LLAMA_API_ANTHROPIC_BASE_URL,
@@ -28,95 +34,347 @@ from .config import (
     LLM_PROVIDER,
     SYSTEM_PROMPT,
     MAX_TOKENS,
-    REQUEST_TIMEOUT,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_MAX_DELAY,
+    LLM_STREAM,
+    PROMPT_CACHE,
+    STRUCTURED_OUTPUT,
 )
+from .http_clients import get_client
 from .schema import (
     ChatRequest,
     GenerateMetricsRequest,
     RefinedPromptResponse,
     MetricsResponse,
     ChatResponse,
+    ConversationMessage,
     MetricSuggestion,
     Phase,
 )
+from .system_prompt import detect_product_area, phase_appendix
 
 logger = logging.getLogger(__name__)
 
 
-# --- Provider-specific API calls ---
+# --- Provider endpoints and headers (resolved once at import) ---
+
+if LLM_PROVIDER == "anthropic_direct":
+    _ANTHROPIC_URL = f"{ANTHROPIC_DIRECT_BASE_URL}/v1/messages"
+    _ANTHROPIC_KEY = ANTHROPIC_API_KEY
+else:
+    _ANTHROPIC_URL = f"{LLAMA_API_ANTHROPIC_BASE_URL}/v1/messages"
+    _ANTHROPIC_KEY = LLAMA_API_KEY if LLM_PROVIDER == "llama_api" else ""
+
+_ANTHROPIC_HEADERS = MappingProxyType({
+    "content-type": "application/json",
+    "anthropic-version": "2023-06-01",
+    **({"x-api-key": _ANTHROPIC_KEY} if _ANTHROPIC_KEY else {}),
+})
+
+_LLAMA_NATIVE_URL = f"{LLAMA_API_NATIVE_BASE_URL}/v1/chat/completions"
+_LLAMA_NATIVE_HEADERS = MappingProxyType({
+    "content-type": "application/json",
+    "Authorization": f"Bearer {LLAMA_API_KEY}",
+})
+
+_OPENAI_URL = f"{OPENAI_API_BASE_URL}/v1/chat/completions"
+_OPENAI_HEADERS = MappingProxyType({
+    "content-type": "application/json",
+    "Authorization": f"Bearer {OPENAI_API_KEY}",
+})
+
+# Static system prompt — the provider prompt-cache prefix. Per-request text
+# (phase guidance, JSON schema) goes in a separate suffix so these bytes
+# never change between calls. Replaced by set_system_prompt() on hot reload.
+_SYSTEM_PROMPT = SYSTEM_PROMPT
+
+# Trailing commas before a closing brace/bracket — a common LLM JSON error
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+_LEADING_WS_RE = re.compile(r'\s*')
+
+
+# --- Provider errors ---
+
+class LLMProviderError(Exception):
+    """Non-2xx response from the LLM provider."""
+
+    # Status the API server returns to its own client for this error
+    api_status = 502
+
+    def __init__(self, status_code: int, detail: str = "", retry_after: Optional[str] = None):
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        super().__init__(f"{LLM_PROVIDER} returned HTTP {status_code}: {detail[:500]}")
+
+
+class RateLimited(LLMProviderError):
+    """429 — retried with backoff."""
+
+    api_status = 429
+
+
+class ProviderUnavailable(LLMProviderError):
+    """5xx (including Anthropic's 529 overload) — retried with backoff."""
+
+    api_status = 503
+
+
+class BadRequest(LLMProviderError):
+    """Other 4xx — the request itself is wrong, so it is never retried."""
+
+
+_RETRYABLE_ERRORS = (RateLimited, ProviderUnavailable)
 
-async def _call_anthropic(system: str, messages: list[dict]) -> str:
-    """Call the Anthropic Messages API (via Llama API passthrough or direct)."""
-    if LLM_PROVIDER == "anthropic_direct":
-        base_url = ANTHROPIC_DIRECT_BASE_URL
-    else:
-        base_url = LLAMA_API_ANTHROPIC_BASE_URL
 
-    url = f"{base_url}/v1/messages"
+def _provider_error(response: httpx.Response) -> LLMProviderError:
+    """Map a non-2xx provider response (body already read) to a typed error."""
+    status = response.status_code
+    retry_after = response.headers.get("retry-after")
+    if status == 429:
+        return RateLimited(status, response.text, retry_after)
+    if status >= 500:
+        return ProviderUnavailable(status, response.text, retry_after)
+    return BadRequest(status, response.text)
 
-    headers = {
-        "content-type": "application/json",
-        "anthropic-version": "2023-06-01",
+
+# --- Structured output ---
+# Each public function passes its response model down to the provider, which
+# constrains decoding to the model's JSON schema, so the reply always parses.
+
+_RESPONSE_MODELS = (RefinedPromptResponse, MetricsResponse, ChatResponse)
+
+
+@cache
+def _json_schema(model: type[BaseModel]) -> dict:
+    return model.model_json_schema()
+
+
+# Anthropic caches tool definitions ahead of the system prompt, so every call
+# sends the same tool list and tool_choice picks the one to fill; switching
+# tool_choice leaves the cached prefix intact.
+_ANTHROPIC_TOOLS = [
+    {"name": model.__name__, "description": model.__doc__, "input_schema": _json_schema(model)}
+    for model in _RESPONSE_MODELS
+]
+
+
+def _anthropic_output(response_model: Optional[type[BaseModel]]) -> dict:
+    """Messages API params that force the reply into response_model's tool."""
+    if response_model is None or not STRUCTURED_OUTPUT:
+        return {}
+    return {
+        "tools": _ANTHROPIC_TOOLS,
+        "tool_choice": {"type": "tool", "name": response_model.__name__},
+    }
+
+
+def _openai_output(response_model: Optional[type[BaseModel]]) -> dict:
+    """chat/completions params that constrain the reply to response_model's schema."""
+    if response_model is None or not STRUCTURED_OUTPUT:
+        return {}
+    # Not strict: strict mode rejects free-form objects (ChatResponse.config_updates)
+    # and optional fields; pydantic validation still runs on the result.
+    return {
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": response_model.__name__,
+                "schema": _json_schema(response_model),
+                "strict": False,
+            },
+        },
     }
-    if LLM_PROVIDER == "anthropic_direct" and ANTHROPIC_API_KEY:
-        headers["x-api-key"] = ANTHROPIC_API_KEY
-    elif LLM_PROVIDER == "llama_api" and LLAMA_API_KEY:
-        headers["x-api-key"] = LLAMA_API_KEY
+
+
+# --- Provider-specific API calls ---
+
+def _retry_delay(error: LLMProviderError, attempt: int) -> float:
+    """Backoff for a retryable error: Retry-After if given, else 2^attempt + jitter."""
+    if error.retry_after:
+        try:
+            return min(float(error.retry_after), LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass  # HTTP-date form; fall back to exponential backoff
+    return min(2 ** attempt, LLM_RETRY_MAX_DELAY) + random.random()
+
+
+async def _backoff_or_raise(error: LLMProviderError, attempt: int) -> None:
+    """Sleep before the next attempt, or raise if the error is final."""
+    if not isinstance(error, _RETRYABLE_ERRORS) or attempt == LLM_MAX_RETRIES:
+        raise error
+    delay = _retry_delay(error, attempt)
+    logger.warning(
+        f"{LLM_PROVIDER} returned {error.status_code}, "
+        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{LLM_MAX_RETRIES})"
+    )
+    await asyncio.sleep(delay)
+
+
+async def _post_with_retry(
+    url: str,
+    headers: Mapping[str, str],
+    payload: dict,
+) -> httpx.Response:
+    """
+    POST to the provider and return a successful response.
+
+    RateLimited/ProviderUnavailable are retried with exponential backoff;
+    BadRequest is raised immediately.
+    """
+    client = get_client()
+    # Encode once with orjson (not httpx's stdlib json.dumps) and reuse the
+    # bytes across retries; headers already carry the JSON content-type.
+    body = orjson.dumps(payload)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        response = await client.post(url, content=body, headers=headers)
+        if response.is_success:
+            logger.debug(f"{LLM_PROVIDER} responded over {response.http_version}")
+            return response
+        await _backoff_or_raise(_provider_error(response), attempt)
+
+
+def _join_system(system: str, system_suffix: str) -> str:
+    return f"{system}\n\n{system_suffix}" if system_suffix else system
+
+
+def _anthropic_system(system: str, system_suffix: str):
+    """Build the Messages API `system` field, caching the static prefix."""
+    if not (system_suffix and PROMPT_CACHE):
+        return _join_system(system, system_suffix)
+    return [
+        {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": system_suffix},
+    ]
+
+
+def _anthropic_text(content_blocks: list[dict]) -> str:
+    """Reply text from Messages API content blocks."""
+    # Almost every response is a single text block
+    if len(content_blocks) == 1 and content_blocks[0].get("type") == "text":
+        return content_blocks[0]["text"]
+    # Structured output arrives as the forced tool's (already parsed) input;
+    # re-encode it so every provider hands _parse_json_response the same thing
+    for block in content_blocks:
+        if block.get("type") == "tool_use":
+            return orjson.dumps(block["input"]).decode()
+    text_parts = [block["text"] for block in content_blocks if block.get("type") == "text"]
+    return "".join(text_parts)
+
+
+async def _call_anthropic(
+    system: str,
+    messages: list[dict],
+    system_suffix: str = "",
+    response_model: Optional[type[BaseModel]] = None,
+) -> str:
+    """Call the Anthropic Messages API (via Llama API passthrough or direct)."""
+    url = _ANTHROPIC_URL
+    headers = _ANTHROPIC_HEADERS
 
     payload = {
         "model": LLM_MODEL,
         "max_tokens": MAX_TOKENS,
-        "system": system,
+        "system": _anthropic_system(system, system_suffix),
         "messages": messages,
         "stream": False,
+        **_anthropic_output(response_model),
     }
 
     logger.info(f"Calling {LLM_PROVIDER} ({LLM_MODEL}) at {url}")
 
-    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-        response = await client.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    response = await _post_with_retry(url, headers, payload)
+    data = orjson.loads(response.content)
 
-    content_blocks = data.get("content", [])
-    text_parts = [block["text"] for block in content_blocks if block.get("type") == "text"]
-    return "".join(text_parts)
+    return _anthropic_text(data.get("content", []))
 
 
-async def _call_llama_native(system: str, messages: list[dict]) -> str:
-    """Call the native Llama API (OpenAI-compatible chat/completions format)."""
-    url = f"{LLAMA_API_NATIVE_BASE_URL}/v1/chat/completions"
+async def _read_sse_text(response: httpx.Response) -> str:
+    """
+    Concatenate the text deltas of a chat/completions SSE stream.
 
-    headers = {
-        "content-type": "application/json",
-        "Authorization": f"Bearer {LLAMA_API_KEY}",
-    }
+    Handles OpenAI delta frames ({"choices": [{"delta": {"content": ...}}]})
+    and native Llama API frames ({"event": {"delta": {"text": ...}}}).
+    """
+    parts = []
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        frame = line[5:].strip()
+        if frame == "[DONE]":
+            break
+        if not frame:
+            continue
+
+        chunk = orjson.loads(frame)
+        choices = chunk.get("choices")
+        if choices:
+            text = (choices[0].get("delta") or {}).get("content")
+        else:
+            text = ((chunk.get("event") or {}).get("delta") or {}).get("text")
+        if text:
+            parts.append(text)
+
+    return "".join(parts)
+
+
+async def _stream_chat_completion(url: str, headers: Mapping[str, str], payload: dict) -> str:
+    """
+    Stream a chat/completions response over SSE and return the full text.
 
-    # Convert to OpenAI format: system message + user/assistant messages
-    oai_messages = [{"role": "system", "content": system}]
-    for msg in messages:
-        oai_messages.append({
-            "role": msg.get("role", "user"),
-            "content": msg.get("content", ""),
-        })
+    Reads tokens as they arrive instead of waiting for the whole body. A
+    non-2xx status is retried like _post_with_retry; once the stream has
+    started it is read to the end without retrying.
+    """
+    client = get_client()
+    body = orjson.dumps(payload)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        async with client.stream("POST", url, content=body, headers=headers) as response:
+            logger.debug(f"{LLM_PROVIDER} streaming over {response.http_version}")
+            if response.is_success:
+                return await _read_sse_text(response)
+            await response.aread()  # error bodies only; success is read line by line
+            error = _provider_error(response)
+        # Outside the stream context, so the connection is released before sleeping
+        await _backoff_or_raise(error, attempt)
+
+
+async def _call_openai_format(
+    url: str,
+    headers: Mapping[str, str],
+    system: str,
+    messages: list[dict],
+    system_suffix: str = "",
+    response_model: Optional[type[BaseModel]] = None,
+) -> str:
+    """Call an OpenAI-compatible chat/completions endpoint (native Llama API or OpenAI)."""
+    # OpenAI format carries the system prompt as the first message; callers
+    # already pass {"role", "content"} dicts, so no per-message copy is needed.
+    # These providers cache any stable prefix automatically, so the suffix
+    # just follows the static prompt in the same message.
+    oai_messages = [
+        {"role": "system", "content": _join_system(system, system_suffix)},
+        *messages,
+    ]
 
     payload = {
         "model": LLM_MODEL,
         "max_tokens": MAX_TOKENS,
         "messages": oai_messages,
-        "stream": False,
+        "stream": LLM_STREAM,
+        **_openai_output(response_model),
     }
 
-    logger.info(f"Calling llama_native ({LLM_MODEL}) at {url}")
+    logger.info(f"Calling {LLM_PROVIDER} ({LLM_MODEL}) at {url}")
+
+    if LLM_STREAM:
+        return await _stream_chat_completion(url, headers, payload)
 
-    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-        response = await client.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    response = await _post_with_retry(url, headers, payload)
+    data = orjson.loads(response.content)
 
-    # Native Llama API returns OpenAI-compatible format
-    # Response shape: {"completion_message": {"content": {"text": "..."}}} or
-    #                 {"choices": [{"message": {"content": "..."}}]}
+    # Native Llama API: {"completion_message": {"content": {"text": "..."}}}
+    # OpenAI (and Llama compat mode): {"choices": [{"message": {"content": "..."}}]}
     completion = data.get("completion_message")
     if completion:
         content = completion.get("content", {})
@@ -126,98 +384,198 @@ async def _call_llama_native(system: str, messages: list[dict]) -> str:
 
     choices = data.get("choices", [])
     if choices:
-        return choices[0].get("message", {}).get("content", "")
+        return choices[0].get("message", {}).get("content") or ""
 
     return ""
 
 
-async def _call_openai(system: str, messages: list[dict]) -> str:
-    """Call the OpenAI API (GPT-4o, o1, etc.) — standard chat/completions format."""
-    url = f"{OPENAI_API_BASE_URL}/v1/chat/completions"
-
-    headers = {
-        "content-type": "application/json",
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-    }
-
-    oai_messages = [{"role": "system", "content": system}]
-    for msg in messages:
-        oai_messages.append({
-            "role": msg.get("role", "user"),
-            "content": msg.get("content", ""),
-        })
+_call_llama_native = partial(_call_openai_format, _LLAMA_NATIVE_URL, _LLAMA_NATIVE_HEADERS)
+_call_openai = partial(_call_openai_format, _OPENAI_URL, _OPENAI_HEADERS)
 
-    payload = {
-        "model": LLM_MODEL,
-        "max_tokens": MAX_TOKENS,
-        "messages": oai_messages,
-        "stream": False,
-    }
 
-    logger.info(f"Calling openai ({LLM_MODEL}) at {url}")
+_PROVIDER_CALLS = {
+    "llama_native": _call_llama_native,
+    "openai": _call_openai,
+    "llama_api": _call_anthropic,
+    "anthropic_direct": _call_anthropic,
+}
+_CALL_PROVIDER = _PROVIDER_CALLS.get(LLM_PROVIDER, _call_anthropic)
 
-    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-        response = await client.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
 
-    choices = data.get("choices", [])
-    if choices:
-        return choices[0].get("message", {}).get("content", "")
+async def _call_llm(
+    system: str,
+    messages: list[dict],
+    system_suffix: str = "",
+    response_model: Optional[type[BaseModel]] = None,
+) -> str:
+    """
+    Route to the configured provider (selected once at import).
 
-    return ""
+    `system` should be byte-stable across calls so providers can cache it;
+    anything that varies per request belongs in `system_suffix`. With a
+    `response_model`, the provider is asked to emit JSON matching its schema.
+    """
+    return await _CALL_PROVIDER(system, messages, system_suffix, response_model)
 
 
-async def _call_llm(system: str, messages: list[dict]) -> str:
-    """Route to the correct provider."""
-    if LLM_PROVIDER == "llama_native":
-        return await _call_llama_native(system, messages)
-    elif LLM_PROVIDER == "openai":
-        return await _call_openai(system, messages)
-    else:
-        return await _call_anthropic(system, messages)
+# --- Shared helpers ---
 
+def set_system_prompt(prompt: str) -> None:
+    """Swap the static system prompt after a hot reload."""
+    global _SYSTEM_PROMPT
+    _SYSTEM_PROMPT = prompt
 
-# --- Shared helpers ---
 
 def _build_messages(
-    system_prompt: str,
-    conversation_history: list[dict],
+    conversation_history: list[ConversationMessage],
     user_message: str,
     json_schema_instruction: str,
-) -> tuple[str, list[dict]]:
-    """Build the system prompt and messages array."""
-    full_system = f"{system_prompt}\n\n{json_schema_instruction}"
-
-    messages = []
-    for msg in conversation_history:
-        messages.append({
-            "role": msg.get("role", "user"),
-            "content": msg.get("content", ""),
-        })
+    phase: Phase,
+) -> tuple[str, str, list[dict]]:
+    """Build the static system prompt, its per-request suffix, and the messages array."""
+    # The opening message usually names the product; later turns often don't
+    opening = conversation_history[0].content if conversation_history else ""
+    product_area = detect_product_area(f"{opening}\n{user_message}")
+    appendix = phase_appendix(phase, user_message, product_area)
+    system_suffix = f"{appendix}\n\n{json_schema_instruction}"
+
+    messages = [
+        {"role": msg.role, "content": msg.content}
+        for msg in conversation_history
+    ]
     messages.append({"role": "user", "content": user_message})
 
-    return full_system, messages
+    return _SYSTEM_PROMPT, system_suffix, messages
+
+
+def _format_eval_config(eval_config: Optional[dict]) -> str:
+    """Pretty-print the frontend evalConfig for embedding in a prompt."""
+    if not eval_config:
+        return "{}"
+    # Each request carries a freshly parsed dict, so there is nothing stable to
+    # cache on; orjson's indent is fast enough to run every turn.
+    return orjson.dumps(eval_config, option=orjson.OPT_INDENT_2).decode()
+
+
+def _closers(stack: list[list]) -> str:
+    return "".join("}" if frame[0] == "{" else "]" for frame in reversed(stack))
+
+
+def _recover_truncated_json(text: str) -> Optional[dict]:
+    """
+    Best-effort recovery of a JSON object that was cut off before its end.
+
+    Scans from the first '{' tracking strings and, for each open container,
+    where its last complete member or element ended. The member that was
+    still being written is dropped rather than closed off half-filled:
+      - an unfinished object below the root (e.g. a metric cut mid-way) is
+        dropped whole, since its later fields are missing
+      - an unfinished array keeps its complete elements
+      - a container with nothing complete in it is dropped
+    Returns None if the object was never truncated or nothing complete
+    remains.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    # One [bracket, end of last complete child or None] per open container
+    stack: list[list] = []
+    expect_key = False
+    in_string = False
+    string_is_key = False
+    escaped = False
+    in_scalar = False
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                if not string_is_key:
+                    stack[-1][1] = i + 1
+            continue
+
+        if in_scalar and (ch in ",}]" or ch.isspace()):
+            in_scalar = False
+            stack[-1][1] = i
+
+        if ch == '"':
+            in_string = True
+            string_is_key = expect_key
+        elif ch in "{[":
+            stack.append([ch, None])
+            expect_key = ch == "{"
+        elif ch in "}]":
+            if not stack:
+                return None
+            stack.pop()
+            if not stack:
+                return None  # object closed; not a truncation problem
+            stack[-1][1] = i + 1
+            expect_key = False
+        elif ch == ",":
+            expect_key = stack[-1][0] == "{"
+        elif ch == ":":
+            expect_key = False
+        elif not ch.isspace():
+            in_scalar = True  # number, true, false or null; complete once delimited
+
+    if not stack:
+        return None
+
+    # Keep the root and any arrays directly beneath it; the first unfinished
+    # object below the root is the partial member to drop
+    depth = 0
+    while depth + 1 < len(stack) and stack[depth + 1][0] == "[":
+        depth += 1
+    # Cut inside the deepest kept container that has a complete child; an
+    # empty container is dropped along with the member holding it
+    while depth >= 0 and stack[depth][1] is None:
+        depth -= 1
+    if depth < 0:
+        return None
+
+    candidate = text[start:stack[depth][1]] + _closers(stack[:depth + 1])
+    try:
+        return orjson.loads(candidate)
+    except orjson.JSONDecodeError:
+        return None
 
 
 def _parse_json_response(raw_text: str) -> dict:
     """Extract JSON from the LLM response, handling markdown code fences and common LLM errors."""
-    text = raw_text.strip()
-    logger.debug(f"Raw LLM response (first 500 chars): {text[:500]}")
-
-    # Strip markdown code fences if present
-    if text.startswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines).strip()
-
-    # Try direct parse first
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    logger.debug(f"Raw LLM response (first 500 chars): {raw_text[:500]}")
+
+    # Fast path: a bare JSON object needs no fence handling, and the parser
+    # already ignores surrounding whitespace, so skip the strip() copy too
+    first = _LEADING_WS_RE.match(raw_text).end()
+    if raw_text[first:first + 1] == "{":
+        try:
+            return orjson.loads(raw_text)
+        except orjson.JSONDecodeError:
+            pass
+        text = raw_text.strip()
+    else:
+        text = raw_text.strip()
+
+        # Strip markdown code fences if present
+        if text[:3] == "```":
+            lines = text.split("\n")
+            lines = lines[1:]
+            if lines and lines[-1].strip() == "```":
+                lines = lines[:-1]
+            text = "\n".join(lines).strip()
+
+        # Try direct parse first
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
 
     # Sometimes LLMs wrap JSON in extra text. Try to find the outermost JSON object.
     start = text.find("{")
@@ -225,40 +583,42 @@ def _parse_json_response(raw_text: str) -> dict:
     if start != -1 and end != -1 and end > start:
         candidate = text[start:end + 1]
         try:
-            return json.loads(candidate)
-        except json.JSONDecodeError:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
             pass
 
     # Try fixing common issues: trailing commas before closing braces/brackets
-    import re
-    cleaned = re.sub(r',\s*([}\]])', r'\1', text)
+    cleaned = _TRAILING_COMMA_RE.sub(r'\1', text)
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         pass
 
     # Last resort: extract JSON object from any position
     if start != -1 and end != -1:
         candidate = text[start:end + 1]
-        cleaned = re.sub(r',\s*([}\]])', r'\1', candidate)
+        cleaned = _TRAILING_COMMA_RE.sub(r'\1', candidate)
         try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
             pass
 
+    # Output cut off mid-object (usually max_tokens): close it off and keep what we have
+    recovered = _recover_truncated_json(text)
+    if recovered is not None:
+        logger.warning("Recovered truncated JSON from LLM response (likely hit max_tokens)")
+        return recovered
+
     # Log the problematic response for debugging
     logger.error(f"Failed to parse JSON from LLM response:\n{text[:2000]}")
     raise ValueError(f"Could not parse JSON from LLM response")
 
 
-# --- Public API Functions ---
+# --- Schema instructions ---
+# Appended to the system prompt per phase. Templates are filled with str.format,
+# so literal braces in the JSON examples are doubled.
 
-async def handle_initial_description(request: ChatRequest) -> RefinedPromptResponse:
-    """
-    Handle the user's initial product description.
-    Returns a refined prompt + clarifying questions.
-    """
-    schema_instruction = """You must respond with ONLY valid JSON matching this exact schema (no markdown, no extra text):
+_INITIAL_SCHEMA = """You must respond with ONLY valid JSON matching this exact schema (no markdown, no extra text):
 
 {
   "message": "Your conversational response to show in the chat. Acknowledge what the user described, summarize what you understood, and tell the user you've drafted a refined description they can review and edit. Tell them you'll have a few follow-up questions once they're ready.",
@@ -273,26 +633,8 @@ Rules:
 - The refined_prompt should be a complete, self-contained description (not a diff) that adds specificity about inputs, outputs, success criteria, and failure modes
 - In your message, acknowledge what the user said, summarize your understanding, and let them know you've drafted a refined version for their review"""
 
-    system, messages = _build_messages(
-        SYSTEM_PROMPT,
-        [m.dict() for m in request.conversation_history],
-        request.message,
-        schema_instruction,
-    )
-
-    raw = await _call_llm(system, messages)
-    data = _parse_json_response(raw)
-    return RefinedPromptResponse(**data)
-
-
-async def handle_refine_followup(request: ChatRequest) -> ChatResponse:
-    """
-    Handle follow-up messages during the REFINE phase.
-    User may be answering clarifying questions or providing more context.
-    """
-    current_prompt = request.eval_config.get("refinedPrompt", "") if request.eval_config else ""
 
-    schema_instruction = f"""The user is in the REFINE phase. They may be answering your clarifying questions, providing additional context, or asking you to adjust the refined description.
+_REFINE_SCHEMA_TMPL = """The user is in the REFINE phase. They may be answering your clarifying questions, providing additional context, or asking you to adjust the refined description.
 The current refined description is:
 "{current_prompt}"
 
@@ -312,27 +654,11 @@ Rules:
 - If the description is now comprehensive enough, tell the user it looks good and they can click the button to generate metrics
 - In your message, acknowledge what they said and note how it improves the eval description"""
 
-    system, messages = _build_messages(
-        SYSTEM_PROMPT,
-        [m.dict() for m in request.conversation_history],
-        request.message,
-        schema_instruction,
-    )
-
-    raw = await _call_llm(system, messages)
-    data = _parse_json_response(raw)
-    return ChatResponse(**data)
-
 
-async def generate_metrics(request: GenerateMetricsRequest) -> MetricsResponse:
-    """
-    Generate metrics, measurement methods, thresholds, and rationale
-    from a finalized description.
-    """
-    schema_instruction = f"""Based on the following product description, suggest evaluation metrics.
+_METRICS_SCHEMA_TMPL = """Based on the following product description, suggest evaluation metrics.
 
 PRODUCT DESCRIPTION:
-"{request.description}"
+"{description}"
 
 You must respond with ONLY valid JSON matching this exact schema (no markdown, no extra text):
 
@@ -361,34 +687,17 @@ Rules:
 - eval_name: descriptive, snake_case, ending with _eval
 - Keep total response under 3000 tokens"""
 
-    system, messages = _build_messages(
-        SYSTEM_PROMPT,
-        [m.dict() for m in request.conversation_history],
-        request.description,
-        schema_instruction,
-    )
-
-    raw = await _call_llm(system, messages)
-    data = _parse_json_response(raw)
-    return MetricsResponse(**data)
-
 
-async def handle_chat(request: ChatRequest) -> ChatResponse:
-    """
-    Handle general chat messages (metrics editing, automation, review phases).
-    """
-    phase_context = {
-        Phase.METRICS: "The user is reviewing suggested metrics and may want to adjust them.",
-        Phase.SAMPLE_DATA: "The user is configuring test data for their eval. Help them structure inputs and expected outputs.",
-        Phase.CONNECT: "The user is configuring their model endpoint and production log monitoring.",
-        Phase.MANAGE: "The user is configuring automation settings (schedule, alerts, ownership).",
-        Phase.REVIEW: "The user is reviewing the final eval draft before creating it.",
-    }
+_PHASE_CONTEXT = {
+    Phase.METRICS: "The user is reviewing suggested metrics and may want to adjust them.",
+    Phase.SAMPLE_DATA: "The user is configuring test data for their eval. Help them structure inputs and expected outputs.",
+    Phase.CONNECT: "The user is configuring their model endpoint and production log monitoring.",
+    Phase.MANAGE: "The user is configuring automation settings (schedule, alerts, ownership).",
+    Phase.REVIEW: "The user is reviewing the final eval draft before creating it.",
+}
 
-    context = phase_context.get(request.phase, "The user needs help with their eval configuration.")
-    config_json = json.dumps(request.eval_config, indent=2) if request.eval_config else "{}"
 
-    schema_instruction = f"""{context}
+_CHAT_SCHEMA_TMPL = """{context}
 
 Current eval configuration:
 {config_json}
@@ -405,16 +714,86 @@ You must respond with ONLY valid JSON matching this exact schema:
 Rules:
 - If the user asks to change specific config values, include them in config_updates
 - If the user asks to update metrics, include the full updated metrics array in the metrics field
+- Each metric's "measurement" must only use these method IDs: exact_match_ratio, simple_pass_fail, weighted_composite, contains_check, numeric_tolerance, fuzzy_string_match, classification_f1, llm_judge, field_f1, task_success_rate, tool_correctness
 - If no config changes are needed, set config_updates to null
 - Be helpful and concise"""
 
-    system, messages = _build_messages(
-        SYSTEM_PROMPT,
-        [m.dict() for m in request.conversation_history],
+
+# --- Public API Functions ---
+
+async def handle_initial_description(request: ChatRequest) -> RefinedPromptResponse:
+    """
+    Handle the user's initial product description.
+    Returns a refined prompt + clarifying questions.
+    """
+    system, system_suffix, messages = _build_messages(
+        request.conversation_history,
+        request.message,
+        _INITIAL_SCHEMA,
+        Phase.OBJECTIVE,
+    )
+
+    raw = await _call_llm(system, messages, system_suffix, RefinedPromptResponse)
+    data = _parse_json_response(raw)
+    return RefinedPromptResponse.model_validate(data)
+
+
+async def handle_refine_followup(request: ChatRequest) -> ChatResponse:
+    """
+    Handle follow-up messages during the REFINE phase.
+    User may be answering clarifying questions or providing more context.
+    """
+    current_prompt = request.eval_config.get("refinedPrompt", "") if request.eval_config else ""
+
+    schema_instruction = _REFINE_SCHEMA_TMPL.format(current_prompt=current_prompt)
+
+    system, system_suffix, messages = _build_messages(
+        request.conversation_history,
+        request.message,
+        schema_instruction,
+        Phase.REFINE,
+    )
+
+    raw = await _call_llm(system, messages, system_suffix, ChatResponse)
+    data = _parse_json_response(raw)
+    return ChatResponse.model_validate(data)
+
+
+async def generate_metrics(request: GenerateMetricsRequest) -> MetricsResponse:
+    """
+    Generate metrics, measurement methods, thresholds, and rationale
+    from a finalized description.
+    """
+    schema_instruction = _METRICS_SCHEMA_TMPL.format(description=request.description)
+
+    system, system_suffix, messages = _build_messages(
+        request.conversation_history,
+        request.description,
+        schema_instruction,
+        Phase.METRICS,
+    )
+
+    raw = await _call_llm(system, messages, system_suffix, MetricsResponse)
+    data = _parse_json_response(raw)
+    return MetricsResponse.model_validate(data)
+
+
+async def handle_chat(request: ChatRequest) -> ChatResponse:
+    """
+    Handle general chat messages (metrics editing, automation, review phases).
+    """
+    context = _PHASE_CONTEXT.get(request.phase, "The user needs help with their eval configuration.")
+    config_json = _format_eval_config(request.eval_config)
+
+    schema_instruction = _CHAT_SCHEMA_TMPL.format(context=context, config_json=config_json)
+
+    system, system_suffix, messages = _build_messages(
+        request.conversation_history,
         request.message,
         schema_instruction,
+        request.phase,
     )
 
-    raw = await _call_llm(system, messages)
+    raw = await _call_llm(system, messages, system_suffix, ChatResponse)
     data = _parse_json_response(raw)
-    return ChatResponse(**data)
+    return ChatResponse.model_validate(data)
@@ -0,0 +1,19 @@
+"""
+orjson-backed JSON response class for the API.
+
+Used as the app's default_response_class so every endpoint serializes
+through orjson instead of the stdlib json module.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # default=str keeps datetimes/UUIDs/Decimals from DB rows serializable;
+        # OPT_NON_STR_KEYS allows int-keyed dicts (e.g. score histograms).
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
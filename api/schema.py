@@ -6,10 +6,18 @@ ensuring we can reliably parse responses into evalConfig fields.
 
 Also includes request/response models for the eval runner API.
 """
-from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Optional
+import logging
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Any, Dict, List, Literal, Optional, get_args
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
+
+# Value objects built once from LLM output / request bodies and never mutated.
+# extra="ignore" drops stray keys the LLM adds instead of storing them.
+_FROZEN = ConfigDict(frozen=True, extra="ignore")
+
 
 class Phase(str, Enum):
     OBJECTIVE = "objective"
@@ -22,6 +30,8 @@ class Phase(str, Enum):
 
 
 class ClarifyingQuestion(BaseModel):
+    model_config = _FROZEN
+
     question: str = Field(description="The clarifying question to ask the user")
     why: str = Field(description="Brief reason this question matters for eval design")
 
@@ -40,10 +50,30 @@ class RefinedPromptResponse(BaseModel):
     )
 
 
+# The measurement method IDs the UI and scorers support. Must match the keys
+# of system_prompt.MEASUREMENT_METHODS (checked in tests/test_llm.py).
+MeasurementID = Literal[
+    "exact_match_ratio",
+    "simple_pass_fail",
+    "weighted_composite",
+    "contains_check",
+    "numeric_tolerance",
+    "fuzzy_string_match",
+    "classification_f1",
+    "llm_judge",
+    "field_f1",
+    "task_success_rate",
+    "tool_correctness",
+]
+_MEASUREMENT_IDS = frozenset(get_args(MeasurementID))
+
+
 class MetricSuggestion(BaseModel):
     """A single suggested metric with measurement method, thresholds, and rationale."""
+    model_config = _FROZEN
+
     field: str = Field(description="Short metric name, e.g. 'Field Accuracy'")
-    measurement: list[str] = Field(
+    measurement: list[MeasurementID] = Field(
         description="Measurement method IDs. Valid values: exact_match_ratio, simple_pass_fail, "
                     "weighted_composite, contains_check, numeric_tolerance, fuzzy_string_match, "
                     "classification_f1, llm_judge, field_f1, task_success_rate, tool_correctness"
@@ -56,6 +86,21 @@ class MetricSuggestion(BaseModel):
                     "and threshold values were chosen. Should educate the user."
     )
 
+    @field_validator("measurement", mode="before")
+    @classmethod
+    def _drop_unknown_measurements(cls, value: Any) -> Any:
+        # One made-up method ID shouldn't fail the whole LLM reply; keep the
+        # known ones and fail only if nothing usable is left.
+        if not isinstance(value, list):
+            return value
+        known = [m for m in value if isinstance(m, str) and m in _MEASUREMENT_IDS]
+        if len(known) < len(value):
+            unknown = [m for m in value if m not in known]
+            logger.warning(f"Dropping unknown measurement method IDs: {unknown}")
+        if value and not known:
+            raise ValueError(f"no supported measurement method IDs in {value}")
+        return known
+
 
 class MetricsResponse(BaseModel):
     """Returned when generating metrics from a finalized description."""
@@ -84,6 +129,8 @@ class ChatResponse(BaseModel):
 # --- Request schemas ---
 
 class ConversationMessage(BaseModel):
+    model_config = _FROZEN
+
     role: str = Field(description="'user' or 'assistant'")
     content: str
 
@@ -136,6 +183,8 @@ class ValidateMetricsRequest(BaseModel):
 
 
 class MetricFeedback(BaseModel):
+    model_config = _FROZEN
+
     field: str
     status: str  # good, adjust, problematic
     suggestion: str
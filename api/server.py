@@ -8,18 +8,51 @@ Provides endpoints for:
   - Dry-run metric validation
 """
 
+import asyncio
+import json
 import logging
+import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, ValidationError
+
+from mft_evals.eval_service import execute_eval_run, validate_metrics_against_data
+from mft_evals.integrations.log_sources import config_from_eval_data, create_log_source
+from mft_evals.integrations.log_worker import LogIngestionWorker
+from mft_evals.storage import (
+    create_eval as db_create,
+    delete_eval as db_delete,
+    get_eval as db_get,
+    get_run as db_get_run,
+    init_db,
+    list_evals as db_list,
+    list_runs as db_list_runs,
+    update_eval as db_update,
+)
 
-from .config import API_HOST, API_PORT, CORS_ORIGINS, LLM_MODEL, LLM_PROVIDER
+from .config import (
+    API_HOST,
+    API_PORT,
+    API_RELOAD,
+    API_WORKERS,
+    CORS_ORIGINS,
+    LLM_MODEL,
+    LLM_PROVIDER,
+    SYSTEM_PROMPT,
+)
+from .http_clients import HTTP2_ENABLED, close_client, get_client
 from .llm import (
+    LLMProviderError,
     generate_metrics,
     handle_chat,
     handle_initial_description,
     handle_refine_followup,
+    set_system_prompt,
 )
+from .orjson_response import ORJSONResponse
 from .schema import (
     ChatRequest,
     ChatResponse,
@@ -32,14 +65,37 @@ from .schema import (
     UpdateEvalRequest,
     ValidateMetricsRequest,
 )
+from .system_prompt import SYSTEM_PROMPT_SHA256, prompt_sha256
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+# ─── Lifespan: initialize database and LLM client ────────────────────────────
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # init_db does blocking SQLite I/O; keep it off the event loop.
+    await asyncio.to_thread(init_db)
+    logger.info("Database initialized")
+    get_client()
+    logger.info(f"LLM HTTP client initialized (http2={HTTP2_ENABLED})")
+    logger.info(
+        f"System prompt sha256={prompt_sha256(SYSTEM_PROMPT)[:12]} "
+        f"({'default' if prompt_sha256(SYSTEM_PROMPT) == SYSTEM_PROMPT_SHA256 else 'MFT_SYSTEM_PROMPT override'})"
+    )
+    loop_cls = type(asyncio.get_running_loop())
+    logger.info(f"Event loop: {loop_cls.__module__}.{loop_cls.__qualname__}")
+    yield
+    await close_client()
+
+
 app = FastAPI(
     title="MFT Eval Platform API",
     description="Backend for the guided eval builder — proxies LLM calls to Claude via Llama API",
     version="0.2.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -51,20 +107,12 @@ app.add_middleware(
 )
 
 
-# ─── Startup: initialize database ────────────────────────────────────────────
-
-@app.on_event("startup")
-async def startup_event():
-    from mft_evals.storage import init_db
-    init_db()
-    logger.info("Database initialized")
-
-
 # ─── Health Check ─────────────────────────────────────────────────────────────
 
 @app.get("/api/health")
-async def health():
+async def health(response: Response):
     """Health check endpoint."""
+    response.headers["Cache-Control"] = "public, max-age=10"
     return {
         "status": "ok",
         "provider": LLM_PROVIDER,
@@ -74,43 +122,155 @@ async def health():
 
 # ─── Chat / LLM Endpoints ────────────────────────────────────────────────────
 
-@app.post("/api/chat", response_model=None)
-async def chat(request: ChatRequest):
+def _body_errors(model: type[BaseModel], body: bytes, json_errors: list[dict]) -> list[dict]:
     """
-    Main chat endpoint. Routes to the appropriate LLM handler based on the current phase.
+    The 422 errors FastAPI's typed-body parsing would report for `body`.
+
+    Only reached once model_validate_json has failed, so re-parsing here costs
+    nothing on valid requests and keeps error responses unchanged for clients.
     """
+    if not body:
+        return [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
     try:
-        if request.phase == Phase.OBJECTIVE:
-            result = await handle_initial_description(request)
-            return {
-                "type": "refine",
-                "data": result.dict(),
-            }
+        value = json.loads(body)
+    except json.JSONDecodeError as e:
+        return [{
+            "type": "json_invalid",
+            "loc": ("body", e.pos),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": e.msg},
+        }]
+    try:
+        model.model_validate(value, from_attributes=True)
+    except ValidationError as e:
+        json_errors = e.errors(include_url=False)
+    return [{**err, "loc": ("body", *err["loc"])} for err in json_errors]
 
-        elif request.phase == Phase.REFINE:
-            result = await handle_refine_followup(request)
-            return {
-                "type": "chat",
-                "data": result.dict(),
-            }
 
-        else:
-            result = await handle_chat(request)
-            return {
-                "type": "chat",
-                "data": result.dict(),
-            }
+def _json_body(model: type[BaseModel]):
+    """
+    Dependency that validates the raw request body with model_validate_json.
+
+    pydantic-core parses the bytes straight into the model in one pass,
+    skipping FastAPI's json.loads -> dict -> validate round trip. Errors
+    are re-raised as RequestValidationError so clients still get a 422
+    with "body"-prefixed locations.
+    """
+    async def parse(raw: Request) -> BaseModel:
+        body = await raw.body()
+        try:
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(_body_errors(model, body, e.errors(include_url=False)))
+
+    return parse
+
+
+# Models read through _json_body. FastAPI can't see a body it doesn't parse,
+# so each route documents it with openapi_extra and the schemas are added to
+# components when the OpenAPI document is first built.
+_JSON_BODY_MODELS: list[type[BaseModel]] = []
+
 
+def _json_body_openapi(model: type[BaseModel]) -> dict:
+    """openapi_extra for a route whose body is read with _json_body(model)."""
+    _JSON_BODY_MODELS.append(model)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}},
+            },
+        },
+        "responses": {
+            "422": {
+                "description": "Validation Error",
+                "content": {
+                    "application/json": {"schema": {"$ref": "#/components/schemas/HTTPValidationError"}},
+                },
+            },
+        },
+    }
+
+
+_fastapi_openapi = app.openapi
+
+
+def _openapi() -> dict:
+    if app.openapi_schema is None:
+        schemas = _fastapi_openapi().setdefault("components", {}).setdefault("schemas", {})
+        for model in _JSON_BODY_MODELS:
+            schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            for name, definition in schema.pop("$defs", {}).items():
+                schemas.setdefault(name, definition)
+            schemas.setdefault(model.__name__, schema)
+    return app.openapi_schema
+
+
+app.openapi = _openapi
+
+
+# Phase -> (handler, response envelope prefix); any other phase is general chat.
+_PHASE_DISPATCH = {
+    Phase.OBJECTIVE: (handle_initial_description, b'{"type":"refine","data":'),
+    Phase.REFINE: (handle_refine_followup, b'{"type":"chat","data":'),
+}
+_DEFAULT_DISPATCH = (handle_chat, b'{"type":"chat","data":')
+
+
+@app.post("/api/chat", response_model=None, openapi_extra=_json_body_openapi(ChatRequest))
+async def chat(request: ChatRequest = Depends(_json_body(ChatRequest))):
+    """
+    Main chat endpoint. Routes to the appropriate LLM handler based on the current phase.
+    """
+    try:
+        handler, envelope = _PHASE_DISPATCH.get(request.phase, _DEFAULT_DISPATCH)
+        result = await handler(request)
+
+        # Serialize the model straight to JSON bytes in pydantic-core and
+        # splice it into the envelope, skipping the intermediate dict.
+        data = result.__pydantic_serializer__.to_json(result)
+        return Response(envelope + data + b"}", media_type="application/json")
+
+    except LLMProviderError as e:
+        logger.error(f"Chat error: {e}")
+        raise HTTPException(status_code=e.api_status, detail=f"LLM request failed: {str(e)}")
+    except ValidationError as e:
+        # The request body was validated by _json_body before this point, so
+        # this is the LLM's reply not fitting the response model
+        logger.error(f"Chat error: LLM reply failed validation: {e}")
+        raise HTTPException(status_code=502, detail=f"LLM returned an invalid response: {str(e)}")
     except Exception as e:
         logger.error(f"Chat error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"LLM request failed: {str(e)}")
 
 
-@app.post("/api/generate-metrics", response_model=MetricsResponse)
-async def gen_metrics(request: GenerateMetricsRequest):
+# Documented via `responses` so OpenAPI keeps the schema without FastAPI
+# re-validating the returned model at runtime.
+@app.post(
+    "/api/generate-metrics",
+    responses={200: {"model": MetricsResponse}},
+    openapi_extra=_json_body_openapi(GenerateMetricsRequest),
+)
+async def gen_metrics(request: GenerateMetricsRequest = Depends(_json_body(GenerateMetricsRequest))):
     """Generate metrics from a finalized description."""
     try:
-        return await generate_metrics(request)
+        # generate_metrics already validated the LLM output into a
+        # MetricsResponse; skip response_model re-validation on the way out.
+        result = await generate_metrics(request)
+        return Response(
+            result.__pydantic_serializer__.to_json(result),
+            media_type="application/json",
+        )
+    except LLMProviderError as e:
+        logger.error(f"Generate metrics error: {e}")
+        raise HTTPException(status_code=e.api_status, detail=f"LLM request failed: {str(e)}")
+    except ValidationError as e:
+        # The request body was validated by _json_body before this point, so
+        # this is the LLM's reply not fitting the response model
+        logger.error(f"Generate metrics error: LLM reply failed validation: {e}")
+        raise HTTPException(status_code=502, detail=f"LLM returned an invalid response: {str(e)}")
     except Exception as e:
         logger.error(f"Generate metrics error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"LLM request failed: {str(e)}")
@@ -125,7 +285,8 @@ async def update_system_prompt(body: dict):
     if not new_prompt:
         raise HTTPException(status_code=400, detail="system_prompt is required")
     config.SYSTEM_PROMPT = new_prompt
-    logger.info(f"System prompt updated ({len(new_prompt)} chars)")
+    set_system_prompt(new_prompt)
+    logger.info(f"System prompt updated ({len(new_prompt)} chars, sha256={prompt_sha256(new_prompt)[:12]})")
     return {"status": "ok", "prompt_length": len(new_prompt)}
 
 
@@ -135,7 +296,6 @@ async def update_system_prompt(body: dict):
 async def create_eval(request: CreateEvalRequest):
     """Create a new eval from the frontend evalConfig."""
     try:
-        from mft_evals.storage import create_eval as db_create
         eval_record = db_create(request.eval_config)
         return {"status": "ok", "eval": eval_record}
     except Exception as e:
@@ -147,9 +307,8 @@ async def create_eval(request: CreateEvalRequest):
 async def list_evals(team: str = None, status: str = None, limit: int = 50, offset: int = 0):
     """List all evals with optional filtering."""
     try:
-        from mft_evals.storage import list_evals as db_list
         evals = db_list(team=team, status=status, limit=limit, offset=offset)
-        return {"evals": evals, "count": len(evals)}
+        return ORJSONResponse({"evals": evals, "count": len(evals)})
     except Exception as e:
         logger.error(f"List evals error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -158,7 +317,6 @@ async def list_evals(team: str = None, status: str = None, limit: int = 50, offs
 @app.get("/api/evals/{eval_id}")
 async def get_eval(eval_id: str):
     """Get a single eval by ID."""
-    from mft_evals.storage import get_eval as db_get
     eval_record = db_get(eval_id)
     if not eval_record:
         raise HTTPException(status_code=404, detail=f"Eval not found: {eval_id}")
@@ -169,10 +327,10 @@ async def get_eval(eval_id: str):
 async def update_eval(eval_id: str, request: UpdateEvalRequest):
     """Update an eval's configuration."""
     try:
-        from mft_evals.storage import update_eval as db_update
         updated = db_update(eval_id, request.updates)
         if not updated:
             raise HTTPException(status_code=404, detail=f"Eval not found: {eval_id}")
+        _log_schema_cache.pop(eval_id, None)
         return {"status": "ok", "eval": updated}
     except HTTPException:
         raise
@@ -184,10 +342,10 @@ async def update_eval(eval_id: str, request: UpdateEvalRequest):
 @app.delete("/api/evals/{eval_id}")
 async def delete_eval(eval_id: str):
     """Delete an eval and all its runs."""
-    from mft_evals.storage import delete_eval as db_delete
     deleted = db_delete(eval_id)
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Eval not found: {eval_id}")
+    _log_schema_cache.pop(eval_id, None)
     return {"status": "ok", "deleted": eval_id}
 
 
@@ -200,7 +358,6 @@ async def run_eval(eval_id: str, request: RunEvalRequest = None):
     dataset and model, scores results, and stores them.
     """
     try:
-        from mft_evals.eval_service import execute_eval_run
         trigger = request.trigger if request else "manual"
         result = await execute_eval_run(eval_id, trigger=trigger)
         return {"status": "ok", "run": result}
@@ -215,9 +372,8 @@ async def run_eval(eval_id: str, request: RunEvalRequest = None):
 async def list_runs(eval_id: str, status: str = None, limit: int = 20, offset: int = 0):
     """List all runs for an eval."""
     try:
-        from mft_evals.storage import list_runs as db_list_runs
         runs = db_list_runs(eval_id, status=status, limit=limit, offset=offset)
-        return {"runs": runs, "count": len(runs)}
+        return ORJSONResponse({"runs": runs, "count": len(runs)})
     except Exception as e:
         logger.error(f"List runs error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -226,7 +382,6 @@ async def list_runs(eval_id: str, status: str = None, limit: int = 20, offset: i
 @app.get("/api/runs/{run_id}")
 async def get_run(run_id: str):
     """Get a single run by ID with full results."""
-    from mft_evals.storage import get_run as db_get_run
     run = db_get_run(run_id)
     if not run:
         raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
@@ -236,11 +391,10 @@ async def get_run(run_id: str):
 @app.get("/api/runs/{run_id}/results")
 async def get_run_results(run_id: str):
     """Get detailed results for a run (per-example scores, failures)."""
-    from mft_evals.storage import get_run as db_get_run
     run = db_get_run(run_id)
     if not run:
         raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
-    return {
+    return ORJSONResponse({
         "run_id": run_id,
         "status": run.get("status"),
         "primary_score": run.get("primary_score"),
@@ -255,19 +409,18 @@ async def get_run_results(run_id: str):
         "failures": run.get("failures", []),
         "duration_ms": run.get("duration_ms"),
         "error_message": run.get("error_message"),
-    }
+    })
 
 
 # ─── Dry-Run / Validate Metrics ──────────────────────────────────────────────
 
-@app.post("/api/validate-metrics")
-async def validate_metrics(request: ValidateMetricsRequest):
+@app.post("/api/validate-metrics", openapi_extra=_json_body_openapi(ValidateMetricsRequest))
+async def validate_metrics(request: ValidateMetricsRequest = Depends(_json_body(ValidateMetricsRequest))):
     """
     Dry-run: validate proposed metrics against sample data.
     Uses the LLM to assess whether metrics and thresholds are realistic.
     """
     try:
-        from mft_evals.eval_service import validate_metrics_against_data
         result = await validate_metrics_against_data(
             metrics=request.metrics,
             sample_data=request.sample_data,
@@ -288,9 +441,6 @@ async def test_log_connection(eval_id: str):
     Returns connection status, message, and a sample row if available.
     """
     try:
-        from mft_evals.storage import get_eval as db_get
-        from mft_evals.integrations.log_sources import config_from_eval_data, create_log_source
-
         eval_data = db_get(eval_id)
         if not eval_data:
             raise HTTPException(status_code=404, detail=f"Eval not found: {eval_id}")
@@ -322,8 +472,6 @@ async def ingest_production_logs(eval_id: str, trigger_run: bool = False, max_ro
     an eval run.
     """
     try:
-        from mft_evals.integrations.log_worker import LogIngestionWorker
-
         if not hasattr(app.state, "log_worker"):
             app.state.log_worker = LogIngestionWorker()
 
@@ -339,16 +487,25 @@ async def ingest_production_logs(eval_id: str, trigger_run: bool = False, max_ro
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
 
+# Fetched log-source schemas keyed by eval_id: (monotonic deadline, response).
+# Dropped early when the eval is updated or deleted.
+_LOG_SCHEMA_TTL = 60.0
+_LOG_SCHEMA_CACHE_CONTROL = f"private, max-age={int(_LOG_SCHEMA_TTL)}"
+_log_schema_cache: dict[str, tuple[float, dict]] = {}
+
+
 @app.get("/api/evals/{eval_id}/log-schema")
-async def get_log_schema(eval_id: str):
+async def get_log_schema(eval_id: str, response: Response):
     """
     Get the schema of the eval's configured production log source.
     Returns available columns/fields for mapping.
     """
-    try:
-        from mft_evals.storage import get_eval as db_get
-        from mft_evals.integrations.log_sources import config_from_eval_data, create_log_source
+    cached = _log_schema_cache.get(eval_id)
+    if cached and cached[0] > time.monotonic():
+        response.headers["Cache-Control"] = _LOG_SCHEMA_CACHE_CONTROL
+        return cached[1]
 
+    try:
         eval_data = db_get(eval_id)
         if not eval_data:
             raise HTTPException(status_code=404, detail=f"Eval not found: {eval_id}")
@@ -359,7 +516,10 @@ async def get_log_schema(eval_id: str):
 
         source = create_log_source(log_config)
         schema = await source.get_schema()
-        return {"schema": schema}
+        result = {"schema": schema}
+        _log_schema_cache[eval_id] = (time.monotonic() + _LOG_SCHEMA_TTL, result)
+        response.headers["Cache-Control"] = _LOG_SCHEMA_CACHE_CONTROL
+        return result
 
     except HTTPException:
         raise
@@ -380,7 +540,11 @@ def start():
         "api.server:app",
         host=API_HOST,
         port=API_PORT,
-        reload=True,
+        reload=API_RELOAD,
+        workers=API_WORKERS,
+        # "auto" picks uvloop when installed, falling back to asyncio
+        loop="auto",
+        http="httptools",
     )
 
 
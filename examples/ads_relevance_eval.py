@@ -20,6 +20,10 @@ Run:
     python examples/ads_relevance_eval.py
 """
 
+import asyncio
+import re
+from itertools import product
+
 from mft_evals import (
     CompositeScorer,
     Dataset,
@@ -30,6 +34,7 @@ from mft_evals import (
     F1Scorer,
     TokenF1Scorer,
 )
+from mft_evals.batching import BatchedInferenceServer
 from mft_evals.eval import EvalOwner, Threshold
 from mft_evals.runner import SimpleEvalRunner
 from mft_evals.scorers import BinaryPassFailScorer
@@ -37,76 +42,100 @@ from mft_evals.scorers import BinaryPassFailScorer
 
 # ── Mock Ads model (replace with your real model / endpoint) ─────────────────
 
+# (query term, ad term, model output) — first rule whose terms both appear wins
+_AD_RULES = (
+    ("running shoes", "nike", {
+        "label": "relevant",
+        "confidence": 0.96,
+        "category": "footwear",
+        "explanation": "Ad for Nike running shoes directly matches the user query for running shoes.",
+    }),
+    ("running shoes", "pizza", {
+        "label": "irrelevant",
+        "confidence": 0.99,
+        "category": "food",
+        "explanation": "Pizza delivery ad is unrelated to a running shoes query.",
+    }),
+    ("laptop", "macbook", {
+        "label": "relevant",
+        "confidence": 0.91,
+        "category": "electronics",
+        "explanation": "MacBook ad is a laptop, matching the user query.",
+    }),
+    ("laptop", "yoga mat", {
+        "label": "irrelevant",
+        "confidence": 0.94,
+        "category": "fitness",
+        "explanation": "Yoga mat ad is unrelated to a laptop search.",
+    }),
+    ("headphones", "sony", {
+        "label": "relevant",
+        "confidence": 0.88,
+        "category": "electronics",
+        "explanation": "Sony headphones match the user headphones query.",
+    }),
+    ("headphones", "dog food", {
+        "label": "irrelevant",
+        "confidence": 0.97,
+        "category": "pet_supplies",
+        "explanation": "Dog food ad does not match headphones query.",
+    }),
+    ("winter jacket", "north face", {
+        "label": "relevant",
+        "confidence": 0.93,
+        "category": "apparel",
+        "explanation": "North Face winter jacket directly matches winter jacket query.",
+    }),
+    ("winter jacket", "sunscreen", {
+        "label": "irrelevant",
+        "confidence": 0.92,
+        "category": "skincare",
+        "explanation": "Sunscreen ad is irrelevant to a winter jacket query.",
+    }),
+)
+
+# Every rule term in one alternation (longest first), so a single regex scan
+# finds all the terms an input contains instead of one `in` test per term.
+_TERM_RE = re.compile("|".join(
+    re.escape(term)
+    for term in sorted({t for rule in _AD_RULES for t in rule[:2]}, key=lambda t: (-len(t), t))
+))
+
+# (query term, ad term) -> rule position, so a lookup replaces scanning rules
+_RULE_INDEX = {(query_term, ad_term): i for i, (query_term, ad_term, _) in enumerate(_AD_RULES)}
+
+_UNKNOWN = {
+    "label": "irrelevant",
+    "confidence": 0.50,
+    "category": "unknown",
+    "explanation": "Could not determine relevance.",
+}
+
+
 def mock_ads_relevance_model(query_and_ad: str) -> dict:
     """
     Simulates an ads relevance model.  In production, replace this with a call
     to your ranking endpoint or LLM agent.
+
+    Returns one of the shared outputs in _AD_RULES (no per-call copy), so
+    treat the result as read-only.
     """
-    query_and_ad_lower = query_and_ad.lower()
-
-    if "running shoes" in query_and_ad_lower and "nike" in query_and_ad_lower:
-        return {
-            "label": "relevant",
-            "confidence": 0.96,
-            "category": "footwear",
-            "explanation": "Ad for Nike running shoes directly matches the user query for running shoes.",
-        }
-    if "running shoes" in query_and_ad_lower and "pizza" in query_and_ad_lower:
-        return {
-            "label": "irrelevant",
-            "confidence": 0.99,
-            "category": "food",
-            "explanation": "Pizza delivery ad is unrelated to a running shoes query.",
-        }
-    if "laptop" in query_and_ad_lower and "macbook" in query_and_ad_lower:
-        return {
-            "label": "relevant",
-            "confidence": 0.91,
-            "category": "electronics",
-            "explanation": "MacBook ad is a laptop, matching the user query.",
-        }
-    if "laptop" in query_and_ad_lower and "yoga mat" in query_and_ad_lower:
-        return {
-            "label": "irrelevant",
-            "confidence": 0.94,
-            "category": "fitness",
-            "explanation": "Yoga mat ad is unrelated to a laptop search.",
-        }
-    if "headphones" in query_and_ad_lower and "sony" in query_and_ad_lower:
-        return {
-            "label": "relevant",
-            "confidence": 0.88,
-            "category": "electronics",
-            "explanation": "Sony headphones match the user headphones query.",
-        }
-    if "headphones" in query_and_ad_lower and "dog food" in query_and_ad_lower:
-        return {
-            "label": "irrelevant",
-            "confidence": 0.97,
-            "category": "pet_supplies",
-            "explanation": "Dog food ad does not match headphones query.",
-        }
-    if "winter jacket" in query_and_ad_lower and "north face" in query_and_ad_lower:
-        return {
-            "label": "relevant",
-            "confidence": 0.93,
-            "category": "apparel",
-            "explanation": "North Face winter jacket directly matches winter jacket query.",
-        }
-    if "winter jacket" in query_and_ad_lower and "sunscreen" in query_and_ad_lower:
-        return {
-            "label": "irrelevant",
-            "confidence": 0.92,
-            "category": "skincare",
-            "explanation": "Sunscreen ad is irrelevant to a winter jacket query.",
-        }
-
-    return {
-        "label": "irrelevant",
-        "confidence": 0.50,
-        "category": "unknown",
-        "explanation": "Could not determine relevance.",
-    }
+    hits = set(_TERM_RE.findall(query_and_ad.lower()))
+
+    # Lowest position among the term pairs present = first matching rule
+    rule = min(
+        (_RULE_INDEX[pair] for pair in product(hits, repeat=2) if pair in _RULE_INDEX),
+        default=None,
+    )
+    return _UNKNOWN if rule is None else _AD_RULES[rule][2]
+
+
+def mock_ads_relevance_batch(queries: list) -> list:
+    """
+    Batch version of mock_ads_relevance_model — one call per dataset instead
+    of one per example, like a batched ranking endpoint.
+    """
+    return [mock_ads_relevance_model(query) for query in queries]
 
 
 def main():
@@ -160,7 +189,7 @@ def main():
     )
 
     results = runner.run(
-        model_fn=lambda q: mock_ads_relevance_model(q)["label"]
+        batch_fn=lambda qs: [r["label"] for r in mock_ads_relevance_batch(qs)]
     )
 
     print(f"\n  Score:       {results['score']:.0%}")
@@ -251,10 +280,12 @@ def main():
         thresholds={"composite": 0.80},
     )
 
-    runner = EvalRunner(eval_obj)
-    results = runner.run(
-        generate_fn=lambda q: mock_ads_relevance_model(q),
-    )
+    # Concurrent per-row calls are grouped into batches for the ranker
+    async def run_batched():
+        async with BatchedInferenceServer(mock_ads_relevance_batch, max_batch=32, flush_ms=50) as server:
+            return await EvalRunner(eval_obj).arun(agenerate_fn=server.submit, max_concurrency=32)
+
+    results = asyncio.run(run_batched())
     print(results.summary())
 
     # ==================================================================
@@ -341,14 +372,10 @@ def main():
         thresholds={"category_f1": 0.80},
     )
 
+    # Outputs are pre-generated in each row's "actual" field, which the
+    # runner reads when no model or generate_fn is given
     taxonomy_runner = EvalRunner(taxonomy_eval)
-    taxonomy_results = taxonomy_runner.run(
-        generate_fn=lambda q: next(
-            tc.metadata["actual"]
-            for tc in taxonomy_dataset
-            if tc.input == q
-        ),
-    )
+    taxonomy_results = taxonomy_runner.run()
     print(taxonomy_results.summary())
 
 
@@ -21,6 +21,8 @@ Run:
     python examples/marketplace_listing_eval.py
 """
 
+import re
+
 from mft_evals import (
     CompositeScorer,
     Dataset,
@@ -155,14 +157,31 @@ MOCK_LISTINGS_DB = [
 ]
 
 
+def _find_listing_output(listing_text: str):
+    """First listing whose title appears in the text, or None."""
+    for listing in MOCK_LISTINGS_DB:
+        if listing["title"] in listing_text:
+            return listing["model_output"]
+    return None
+
+
+# Exact title -> output, resolved with the same first-match rule as the scan,
+# so a bare title (the common case) is one dict lookup
+_OUTPUT_BY_TITLE = {
+    listing["title"]: _find_listing_output(listing["title"]) for listing in MOCK_LISTINGS_DB
+}
+
+
 def mock_listing_quality_model(listing_text: str) -> dict:
     """
     Simulates a Marketplace listing quality model.
     In production, replace with your actual model endpoint call.
     """
-    for listing in MOCK_LISTINGS_DB:
-        if listing["title"] in listing_text:
-            return listing["model_output"]
+    output = _OUTPUT_BY_TITLE.get(listing_text)
+    if output is None:
+        output = _find_listing_output(listing_text)
+    if output is not None:
+        return output
 
     return {
         "quality_label": "medium",
@@ -301,7 +320,7 @@ def main():
 
     eval_runner = EvalRunner(eval_obj)
     results = eval_runner.run(
-        generate_fn=lambda q: mock_listing_quality_model(q.split(" | ")[0]),
+        generate_fn=lambda q: mock_listing_quality_model(q.partition(" | ")[0]),
     )
     print(results.summary())
 
@@ -332,12 +351,12 @@ def main():
         "stolen", "fireworks", "explosive",
     ]
 
+    # One alternation over every keyword: a single scan per title, however
+    # long the keyword list grows
+    blocked_re = re.compile("|".join(map(re.escape, BLOCKED_KEYWORDS)))
+
     def mock_prohibited_detector(title: str) -> str:
-        title_lower = title.lower()
-        for kw in BLOCKED_KEYWORDS:
-            if kw in title_lower:
-                return "blocked"
-        return "allowed"
+        return "blocked" if blocked_re.search(title.lower()) else "allowed"
 
     prohibited_runner = SimpleEvalRunner(
         test_cases=prohibited_cases,
@@ -386,14 +405,10 @@ def main():
         thresholds={"category_f1": 0.80},
     )
 
+    # Outputs are pre-generated in each row's "actual" field, which the
+    # runner reads when no model or generate_fn is given
     taxonomy_runner = EvalRunner(taxonomy_eval)
-    taxonomy_results = taxonomy_runner.run(
-        generate_fn=lambda q: next(
-            tc.metadata["actual"]
-            for tc in taxonomy_dataset
-            if tc.input == q
-        ),
-    )
+    taxonomy_results = taxonomy_runner.run()
     print(taxonomy_results.summary())
 
     # ==================================================================
@@ -9,6 +9,8 @@ From the reference doc:
 from raw transaction descriptions and receipts."
 """
 
+import re
+
 from mft_evals import (
     Eval,
     EvalConfig,
@@ -84,15 +86,10 @@ def main():
         }
     )
 
-    # Run eval (using pre-generated outputs from metadata)
+    # Run eval (using pre-generated outputs from metadata: with no model or
+    # generate_fn, the runner reads each row's "actual" field)
     runner = EvalRunner(eval)
-    results = runner.run(
-        generate_fn=lambda x: next(
-            tc.metadata["actual"]
-            for tc in dataset
-            if tc.input == x
-        )
-    )
+    results = runner.run()
 
     print(results.summary())
 
@@ -161,17 +158,17 @@ def main():
         {"input": "What currency is ¥1000?", "expected": "JPY"},
     ]
 
-    # Mock model function
+    # Mock model function: one scan finds every symbol present; when there
+    # are several, the first in this table wins
+    currency_by_symbol = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+    symbol_re = re.compile("|".join(map(re.escape, currency_by_symbol)))
+
     def mock_currency_detector(input_text: str) -> str:
-        if "$" in input_text:
-            return "USD"
-        elif "€" in input_text:
-            return "EUR"
-        elif "£" in input_text:
-            return "GBP"
-        elif "¥" in input_text:
-            return "JPY"
-        return "UNKNOWN"
+        found = set(symbol_re.findall(input_text))
+        return next(
+            (code for symbol, code in currency_by_symbol.items() if symbol in found),
+            "UNKNOWN",
+        )
 
     simple_runner = SimpleEvalRunner(
         test_cases=simple_tests,
@@ -0,0 +1,132 @@
+"""
+MFT Eval - Micro-batching for model calls
+
+Real models (GPU rankers, LLM endpoints) serve a batch of N inputs far
+cheaper than N single calls. EvalRunner.arun() issues one call per test
+case; BatchedInferenceServer sits in between, collecting concurrent calls
+into batches for a batch-capable model function.
+
+A batch is flushed when it reaches max_batch inputs or flush_ms after its
+first input arrived, whichever comes first — so a partial batch never waits
+longer than the window.
+
+Usage:
+    async def main():
+        async with BatchedInferenceServer(my_model.predict_batch, max_batch=32) as server:
+            return await EvalRunner(eval).arun(agenerate_fn=server.submit, max_concurrency=32)
+
+    results = asyncio.run(main())
+"""
+
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedInferenceServer:
+    """
+    Collects concurrent submit() calls into batches for `batch_fn`.
+
+    Args:
+        batch_fn: Function (sync or async) that takes a list of inputs and
+                  returns a list of outputs in the same order
+        max_batch: Largest batch passed to batch_fn
+        flush_ms: Longest a partial batch waits for more inputs
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Any],
+        max_batch: int = 32,
+        flush_ms: float = 50,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.flush_ms = flush_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input and wait for its output from the next batch."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        self._wakeup.set()
+        return await future
+
+    async def aclose(self) -> None:
+        """Stop the background worker. Pending submits are cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def __aenter__(self) -> "BatchedInferenceServer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.flush_ms / 1000
+
+                while len(batch) < self.max_batch:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+
+                await self._flush(batch)
+        except asyncio.CancelledError:
+            # Fail anything still queued rather than leaving callers hanging
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            raise
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        inputs = [item for item, _ in batch]
+        try:
+            outputs = self.batch_fn(inputs)
+            if inspect.isawaitable(outputs):
+                outputs = await outputs
+            outputs = list(outputs)
+            if len(outputs) != len(inputs):
+                raise ValueError(
+                    f"batch_fn returned {len(outputs)} outputs for {len(inputs)} inputs"
+                )
+        except Exception as e:
+            logger.error(f"Batch of {len(inputs)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Flushed batch of {len(inputs)}")
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
@@ -0,0 +1,113 @@
+"""
+MFT Eval - Persistent model output cache
+
+Re-running an eval re-generates every output, even though most test cases
+and the model haven't changed since the last run. ModelOutputCache wraps a
+model function and stores its outputs in SQLite keyed by
+(model version, input), so a re-run only pays for new or changed rows.
+
+Bump `version` whenever the model changes — stale outputs are never
+invalidated otherwise.
+
+Usage:
+    model = ModelOutputCache(my_model, version="2.0.0")
+    results = EvalRunner(eval).run(generate_fn=model)
+
+Cache location: ~/.mft_evals/output_cache.db (configurable via
+MFT_EVALS_CACHE_PATH or the `path` argument)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".mft_evals" / "output_cache.db"
+
+
+def get_cache_path() -> str:
+    path = os.environ.get("MFT_EVALS_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class ModelOutputCache:
+    """
+    Callable wrapper that caches model_fn outputs on disk.
+
+    Outputs must be JSON-serializable to be cached (they come back as the
+    JSON equivalent, e.g. tuples as lists); anything else is returned
+    uncached. Safe to call from multiple threads.
+
+    Args:
+        model_fn: Function that takes an input and returns an output
+        version: Model version; part of the cache key
+        path: SQLite file (default: get_cache_path())
+    """
+
+    def __init__(
+        self,
+        model_fn: Callable[[Any], Any],
+        version: str = "",
+        path: Optional[str] = None,
+    ):
+        self.model_fn = model_fn
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        path = path or get_cache_path()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs (key TEXT PRIMARY KEY, output_json TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _key(self, input: Any) -> str:
+        payload = json.dumps([self.version, input], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __call__(self, input: Any) -> Any:
+        key = self._key(input)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output_json FROM outputs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if row is not None:
+            return json.loads(row[0])
+
+        output = self.model_fn(input)
+        try:
+            output_json = json.dumps(output)
+        except (TypeError, ValueError):
+            logger.debug(f"Not caching non-JSON output of type {type(output).__name__}")
+            return output
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs (key, output_json) VALUES (?, ?)",
+                (key, output_json),
+            )
+            self._conn.commit()
+        return output
+
+    def clear(self) -> None:
+        """Drop every cached output (all versions)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM outputs")
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -14,8 +14,6 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Union
 
-import yaml
-
 
 class EvalStatus(Enum):
     DRAFT = "draft"
@@ -110,8 +108,11 @@ class EvalConfig:
     @classmethod
     def from_yaml(cls, yaml_path: str) -> "EvalConfig":
         """Load config from YAML file"""
+        # Imported here: most runs build configs in code and never touch YAML
+        import yaml
+
         with open(yaml_path, "r") as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
         return cls._from_dict(data)
 
     @classmethod
@@ -239,8 +240,16 @@ class EvalConfig:
 
     def to_yaml(self, path: str) -> None:
         """Save config to YAML file"""
+        import yaml
+
         with open(path, "w") as f:
-            yaml.dump(self.to_dict(), f, default_flow_style=False, sort_keys=False)
+            yaml.dump(
+                self.to_dict(),
+                f,
+                Dumper=getattr(yaml, "CDumper", yaml.Dumper),
+                default_flow_style=False,
+                sort_keys=False,
+            )
 
     def validate(self) -> List[str]:
         """
@@ -15,13 +15,16 @@ Instrumented with Scuba logging for lifecycle tracking:
 - eval_regression: when a regression is detected vs previous run
 """
 
+import asyncio
 import logging
 import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from mft_evals.cache import ModelOutputCache
 from mft_evals.dataset import Dataset, TestCase
 from mft_evals.eval import Eval, EvalConfig
 from mft_evals.integrations.scuba import ScubaLogger
@@ -31,6 +34,18 @@ from mft_evals.scorers import Scorer, ScorerResult
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _RunContext:
+    """Identifiers resolved when a run starts, reused when it completes."""
+
+    run_id: str
+    start_time: datetime
+    eval_version: str
+    model_version: str
+    gk_name: str
+    task_id: str
+
+
 class EvalRunner:
     """
     Runs evaluations and produces results.
@@ -46,11 +61,24 @@ class EvalRunner:
 
         runner = EvalRunner(eval)
         results = runner.run(model=my_model)
+
+        # Remote model: overlap requests across test cases
+        results = asyncio.run(runner.arun(agenerate_fn=my_async_model, max_concurrency=32))
+
+        # Re-runs: reuse outputs for inputs already seen by this model version
+        runner = EvalRunner(eval, cache_path="~/.mft_evals/output_cache.db")
+        results = runner.run(generate_fn=my_model_fn, cache_version="my-model-2.0")
     """
 
-    def __init__(self, eval: Eval, scuba_logger: ScubaLogger = None):
+    def __init__(
+        self,
+        eval: Eval,
+        scuba_logger: ScubaLogger = None,
+        cache_path: Optional[str] = None,
+    ):
         self.eval = eval
         self._scuba = scuba_logger or ScubaLogger()
+        self.cache_path = os.path.expanduser(cache_path) if cache_path else None
 
     def run(
         self,
@@ -60,6 +88,8 @@ class EvalRunner:
         gk_name: str = "",
         task_id: str = "",
         diff_id: str = "",
+        max_workers: Optional[int] = None,
+        cache_version: str = "",
     ) -> EvalResults:
         """
         Run the evaluation.
@@ -72,10 +102,95 @@ class EvalRunner:
             gk_name: Associated Gatekeeper feature flag
             task_id: Associated Phabricator task ID
             diff_id: Associated diff ID
+            max_workers: Generate outputs on a thread pool of this size, for
+                        blocking calls to a remote model (async models: use
+                        arun). Scoring stays sequential.
+            cache_version: Identifies the model behind generate_fn in the
+                        output cache. Defaults to model.version.
+
+        Generated outputs are cached (see mft_evals.cache) when the runner has
+        a cache_path, keyed by eval name, eval version and cache_version.
+        Change cache_version whenever the model changes: outputs cached under
+        the same version are replayed as-is.
 
         Returns:
             EvalResults with complete evaluation results
         """
+        fn = self._generate_fn(model, generate_fn)
+        use_cache = fn is not None and self.cache_path
+        if use_cache:
+            cache_version = cache_version or (getattr(model, "version", "") if model else "")
+            if not cache_version:
+                # Without a version every model shares one key space, so a
+                # new generate_fn would silently replay the old one's outputs
+                raise ValueError(
+                    "cache_path is set: pass cache_version= (or a model with "
+                    ".version) so cached outputs are tied to the model"
+                )
+
+        run = self._start_run(model, trigger, gk_name, task_id)
+        if not use_cache:
+            actuals = self._generate_all(fn, max_workers)
+            return self._finish_run(run, actuals, trigger, diff_id)
+
+        cache = ModelOutputCache(
+            fn,
+            version=f"{self.eval.name}:{run.eval_version}:{cache_version}",
+            path=self.cache_path,
+        )
+        try:
+            actuals = self._generate_all(cache, max_workers)
+        finally:
+            cache.close()
+        logger.info(f"Output cache: {cache.hits} hits, {cache.misses} misses")
+        return self._finish_run(run, actuals, trigger, diff_id)
+
+    async def arun(
+        self,
+        agenerate_fn: Callable[[Any], Awaitable[Any]],
+        max_concurrency: int = 32,
+        model: Any = None,
+        trigger: str = "manual",
+        gk_name: str = "",
+        task_id: str = "",
+        diff_id: str = "",
+    ) -> EvalResults:
+        """
+        Run the evaluation with an async generate function, calling it for up
+        to `max_concurrency` test cases at once.
+
+        Use this when outputs come from a network endpoint: wall time drops
+        from the sum of per-row latencies to roughly
+        latency * ceil(N / max_concurrency). Scoring is unchanged from run().
+
+        Args:
+            agenerate_fn: Async function to generate outputs from inputs
+            max_concurrency: Maximum in-flight agenerate_fn calls
+            model: Model/agent being evaluated (used for its version only)
+            trigger, gk_name, task_id, diff_id: As for run()
+
+        Returns:
+            EvalResults with complete evaluation results
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        run = self._start_run(model, trigger, gk_name, task_id)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate(test_case: TestCase) -> Any:
+            async with semaphore:
+                return await agenerate_fn(test_case.input)
+
+        actuals = await asyncio.gather(
+            *(generate(test_case) for test_case in self.eval.dataset)
+        )
+        return self._finish_run(run, actuals, trigger, diff_id)
+
+    def _start_run(
+        self, model: Any, trigger: str, gk_name: str, task_id: str
+    ) -> _RunContext:
+        """Validate the eval and log the run start to Scuba."""
         run_id = str(uuid.uuid4())[:8]
         start_time = datetime.now()
 
@@ -109,25 +224,59 @@ class EvalRunner:
         if not self.eval.scorers:
             raise ValueError("At least one scorer is required")
 
+        return _RunContext(
+            run_id=run_id,
+            start_time=start_time,
+            eval_version=eval_version,
+            model_version=model_version,
+            gk_name=effective_gk,
+            task_id=effective_task,
+        )
+
+    @staticmethod
+    def _generate_fn(model: Any, generate_fn: Optional[Callable]) -> Optional[Callable]:
+        """The function producing outputs, or None if they are pre-generated."""
+        if generate_fn:
+            return generate_fn
+        if model and hasattr(model, "__call__"):
+            return model
+        if model and hasattr(model, "generate"):
+            return model.generate
+        return None
+
+    def _generate_all(self, fn: Optional[Callable], max_workers: Optional[int]) -> List[Any]:
+        """Get the actual outputs for every test case, in dataset order."""
+        if fn is None or not max_workers:
+            return [self._generate(test_case, fn) for test_case in self.eval.dataset]
+        with ThreadPoolExecutor(max_workers) as pool:
+            return list(pool.map(fn, [test_case.input for test_case in self.eval.dataset]))
+
+    @staticmethod
+    def _generate(test_case: TestCase, fn: Optional[Callable]) -> Any:
+        """Get the actual output for one test case."""
+        if fn is not None:
+            return fn(test_case.input)
+        # Assume actual output is in metadata
+        return test_case.metadata.get(
+            "actual_output", test_case.metadata.get("actual", "")
+        )
+
+    def _finish_run(
+        self, run: _RunContext, actuals: List[Any], trigger: str, diff_id: str
+    ) -> EvalResults:
+        """Score the generated outputs, check thresholds, and log the results."""
+        run_id = run.run_id
+        eval_version = run.eval_version
+        model_version = run.model_version
+        effective_gk = run.gk_name
+        effective_task = run.task_id
+
         # Process each test case
         detailed_results = []
         failures = []
         per_scorer_scores = {s.name: [] for s in self.eval.scorers}
 
-        for test_case in self.eval.dataset:
-            # Get actual output
-            if generate_fn:
-                actual = generate_fn(test_case.input)
-            elif model and hasattr(model, "__call__"):
-                actual = model(test_case.input)
-            elif model and hasattr(model, "generate"):
-                actual = model.generate(test_case.input)
-            else:
-                # Assume actual output is in metadata
-                actual = test_case.metadata.get(
-                    "actual_output", test_case.metadata.get("actual", "")
-                )
-
+        for test_case, actual in zip(self.eval.dataset, actuals):
             # Score with each scorer
             case_scores = {}
             case_passed = True
@@ -218,9 +367,9 @@ class EvalRunner:
 
         results = EvalResults(
             eval_name=self.eval.name,
-            eval_version=self.eval.config.version if self.eval.config else "1.0.0",
+            eval_version=eval_version,
             run_id=run_id,
-            timestamp=start_time,
+            timestamp=run.start_time,
             model_version=model_version,
             metrics=metrics,
             primary_score=primary_score,
@@ -237,7 +386,7 @@ class EvalRunner:
         logger.info(f"Eval run {run_id} completed: {results.pass_rate:.1%} pass rate")
 
         # ── Scuba: log run completed ──────────────────────────────────
-        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+        duration_ms = int((datetime.now() - run.start_time).total_seconds() * 1000)
 
         self._scuba.log_eval_run_completed(
             eval_name=self.eval.name,
@@ -299,8 +448,12 @@ class SimpleEvalRunner:
         )
 
         results = runner.run(model_fn=lambda x: my_model(x))
+        # or, for a batch endpoint: runner.run(batch_fn=my_model.predict_batch)
     """
 
+    # Failures included in the results dict
+    MAX_FAILURES = 10
+
     def __init__(
         self,
         test_cases: List[Dict[str, Any]],
@@ -311,32 +464,66 @@ class SimpleEvalRunner:
         self.scorer = scorer
         self.name = name
 
-    def run(self, model_fn: Callable[[str], str]) -> Dict[str, Any]:
+    def run(
+        self,
+        model_fn: Callable[[str], str] = None,
+        batch_fn: Callable[[List[str]], List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Run the evaluation with a simple model function.
 
         Args:
             model_fn: Function that takes input and returns output
+            batch_fn: Optional function that takes all inputs at once and
+                      returns outputs in the same order (one call per run,
+                      for models served behind a batch endpoint). Used
+                      instead of model_fn when given.
+            max_workers: Call model_fn on a thread pool of this size, for
+                         blocking calls to a remote model
 
         Returns:
             Simple results dict with score and pass rate
         """
-        scores = []
+        if model_fn is None and batch_fn is None:
+            raise ValueError("Either model_fn or batch_fn is required")
+
+        total_score = 0.0
+        num_passed = 0
         failures = []
 
+        inputs = [tc.get("input", "") for tc in self.test_cases]
+        if batch_fn is not None:
+            try:
+                outputs = list(batch_fn(inputs))
+            except Exception as e:
+                outputs = [f"ERROR: {e}"] * len(inputs)
+            if len(outputs) != len(inputs):
+                raise ValueError(
+                    f"batch_fn returned {len(outputs)} outputs for {len(inputs)} inputs"
+                )
+        elif max_workers:
+            with ThreadPoolExecutor(max_workers) as pool:
+                outputs = list(pool.map(lambda x: self._call(model_fn, x), inputs))
+        else:
+            outputs = None
+
         for i, tc in enumerate(self.test_cases):
-            input_text = tc.get("input", "")
+            input_text = inputs[i]
             expected = tc.get("expected", "")
 
-            try:
-                actual = model_fn(input_text)
-            except Exception as e:
-                actual = f"ERROR: {e}"
+            if outputs is not None:
+                actual = outputs[i]
+            else:
+                actual = self._call(model_fn, input_text)
 
             result = self.scorer.score(expected, actual, input=input_text)
-            scores.append(result.score)
+            total_score += result.score
+            if result.score >= 0.5:
+                num_passed += 1
 
-            if not result.passed:
+            # Only the first failures are reported; don't build the rest
+            if not result.passed and len(failures) < self.MAX_FAILURES:
                 failures.append(
                     {
                         "id": f"test_{i}",
@@ -347,8 +534,9 @@ class SimpleEvalRunner:
                     }
                 )
 
-        avg_score = sum(scores) / len(scores) if scores else 0.0
-        pass_rate = sum(1 for s in scores if s >= 0.5) / len(scores) if scores else 0.0
+        num_tests = len(self.test_cases)
+        avg_score = total_score / num_tests if num_tests else 0.0
+        pass_rate = num_passed / num_tests if num_tests else 0.0
 
         return {
             "name": self.name,
@@ -357,5 +545,13 @@ class SimpleEvalRunner:
             "num_tests": len(self.test_cases),
             "num_passed": int(pass_rate * len(self.test_cases)),
             "passed_80_threshold": pass_rate >= 0.8,  # Default MVE threshold
-            "failures": failures[:10],  # Top 10 failures
+            "failures": failures,  # First MAX_FAILURES failures
         }
+
+    @staticmethod
+    def _call(model_fn: Callable[[str], str], input_text: str) -> Any:
+        """Call model_fn, turning an exception into an error output."""
+        try:
+            return model_fn(input_text)
+        except Exception as e:
+            return f"ERROR: {e}"
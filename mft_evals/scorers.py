@@ -17,14 +17,33 @@ Rules of thumb:
 - Accept imperfect metrics early—iterate later
 """
 
+import concurrent.futures
 import logging
 import re
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Word tokens for TokenF1Scorer: split on whitespace and punctuation
+_TOKEN_RE = re.compile(r'\w+')
+# Currency symbols and thousands separators stripped before parsing numbers
+_NUMBER_NOISE_RE = re.compile(r'[,$€£¥]')
+
+
+@lru_cache(maxsize=4096)
+def _tokenize(text: str, lowercase: bool) -> tuple:
+    """
+    Tokenize once per distinct string. Expected values recur across runs
+    and scorers (and labels recur across rows), so most calls are hits.
+    """
+    if lowercase:
+        text = text.lower()
+    return tuple(_TOKEN_RE.findall(text))
+
 
 @dataclass
 class ScorerResult:
@@ -39,6 +58,28 @@ class ScorerResult:
             self.details = {}
 
 
+def _set_f1(expected_set: set, actual_set: set) -> tuple:
+    """(precision, recall, f1, overlap) of two sets, intersecting them once."""
+    overlap = len(expected_set & actual_set)
+
+    if not actual_set:
+        precision = 0.0
+    else:
+        precision = overlap / len(actual_set)
+
+    if not expected_set:
+        recall = 1.0 if not actual_set else 0.0
+    else:
+        recall = overlap / len(expected_set)
+
+    if precision + recall == 0:
+        f1 = 0.0
+    else:
+        f1 = 2 * (precision * recall) / (precision + recall)
+
+    return precision, recall, f1, overlap
+
+
 class Scorer(ABC):
     """
     Base class for all scorers.
@@ -186,20 +227,7 @@ class F1Scorer(Scorer):
         actual_set = self._to_set(actual_val)
 
         # Calculate precision, recall, F1
-        if not actual_set:
-            precision = 0.0
-        else:
-            precision = len(expected_set & actual_set) / len(actual_set)
-
-        if not expected_set:
-            recall = 1.0 if not actual_set else 0.0
-        else:
-            recall = len(expected_set & actual_set) / len(expected_set)
-
-        if precision + recall == 0:
-            f1 = 0.0
-        else:
-            f1 = 2 * (precision * recall) / (precision + recall)
+        precision, recall, f1, _ = _set_f1(expected_set, actual_set)
 
         return ScorerResult(
             score=f1,
@@ -275,20 +303,7 @@ class TokenF1Scorer(Scorer):
         actual_set = set(actual_tokens)
 
         # Calculate F1
-        if not actual_set:
-            precision = 0.0
-        else:
-            precision = len(expected_set & actual_set) / len(actual_set)
-
-        if not expected_set:
-            recall = 1.0 if not actual_set else 0.0
-        else:
-            recall = len(expected_set & actual_set) / len(expected_set)
-
-        if precision + recall == 0:
-            f1 = 0.0
-        else:
-            f1 = 2 * (precision * recall) / (precision + recall)
+        precision, recall, f1, overlap = _set_f1(expected_set, actual_set)
 
         return ScorerResult(
             score=f1,
@@ -300,7 +315,7 @@ class TokenF1Scorer(Scorer):
                 "expected_tokens": expected_tokens,
                 "actual_tokens": actual_tokens,
             },
-            rationale=f"Token F1={f1:.3f} ({len(expected_set & actual_set)}/{len(expected_set)} tokens matched)"
+            rationale=f"Token F1={f1:.3f} ({overlap}/{len(expected_set)} tokens matched)"
         )
 
     def _get_field(self, obj: Any, field: str) -> Any:
@@ -309,11 +324,8 @@ class TokenF1Scorer(Scorer):
         return getattr(obj, field, None)
 
     def _tokenize(self, text: str) -> List[str]:
-        if self.lowercase:
-            text = text.lower()
-        # Split on whitespace and punctuation, keep alphanumeric
-        tokens = re.findall(r'\w+', text)
-        return tokens
+        # Copy: the cached tuple is shared, the result ends up in details
+        return list(_tokenize(text, self.lowercase))
 
 
 class NumericToleranceScorer(Scorer):
@@ -415,7 +427,7 @@ class NumericToleranceScorer(Scorer):
         # Try to parse string (handle currency symbols, commas)
         val_str = str(val)
         # Remove currency symbols and commas
-        cleaned = re.sub(r'[,$€£¥]', '', val_str)
+        cleaned = _NUMBER_NOISE_RE.sub('', val_str)
         return float(cleaned)
 
 
@@ -533,7 +545,6 @@ RATIONALE: <your explanation>
                 pass
 
             if loop and loop.is_running():
-                import concurrent.futures
                 with concurrent.futures.ThreadPoolExecutor() as pool:
                     future = pool.submit(asyncio.run, api_call_llm(system, messages))
                     return future.result(timeout=30)
@@ -598,14 +609,23 @@ class CompositeScorer(Scorer):
             (NumericToleranceScorer(field="amount"), 0.25),
             (TokenF1Scorer(field="merchant"), 0.15),
         ])
+
+    Components are independent, so with max_workers set they score each row
+    concurrently on a thread pool. That only pays off when a component waits
+    on I/O (an LLMJudgeScorer); the deterministic scorers hold the GIL, so
+    leave it unset for them. The pool is started on first use and reused for
+    every row; call close() (or use the scorer as a context manager) to stop
+    its threads.
     """
 
     def __init__(
         self,
         scorers: List[Union[Scorer, tuple[Scorer, float]]],
         name: str = None,
+        max_workers: Optional[int] = None,
     ):
         super().__init__(name or "composite")
+        self.max_workers = max_workers
 
         self.scorers = []
         self.weights = []
@@ -625,12 +645,45 @@ class CompositeScorer(Scorer):
         if total_weight > 0:
             self.weights = [w / total_weight for w in self.weights]
 
+        # Reported with every result; built once rather than per row
+        self._weights_by_name = dict(zip([s.name for s in self.scorers], self.weights))
+
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix=f"{self.name}-scorer"
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the component thread pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def score(self, expected: Any, actual: Any, **kwargs) -> ScorerResult:
+        if self.max_workers and len(self.scorers) > 1:
+            pool = self._get_pool()
+            futures = [pool.submit(s.score, expected, actual, **kwargs) for s in self.scorers]
+            component_results = [f.result() for f in futures]
+        else:
+            component_results = [s.score(expected, actual, **kwargs) for s in self.scorers]
+
         results = []
         weighted_score = 0.0
 
-        for scorer, weight in zip(self.scorers, self.weights):
-            result = scorer.score(expected, actual, **kwargs)
+        for scorer, weight, result in zip(self.scorers, self.weights, component_results):
             results.append({
                 "scorer": scorer.name,
                 "weight": weight,
@@ -640,16 +693,16 @@ class CompositeScorer(Scorer):
             })
             weighted_score += result.score * weight
 
-        all_passed = all(r["passed"] for r in results)
+        passed_count = sum(1 for r in results if r["passed"])
 
         return ScorerResult(
             score=weighted_score,
-            passed=all_passed,
+            passed=passed_count == len(results),
             details={
                 "component_scores": results,
-                "weights": dict(zip([s.name for s in self.scorers], self.weights)),
+                "weights": dict(self._weights_by_name),
             },
-            rationale=f"Composite score: {weighted_score:.3f} ({sum(1 for r in results if r['passed'])}/{len(results)} components passed)"
+            rationale=f"Composite score: {weighted_score:.3f} ({passed_count}/{len(results)} components passed)"
         )
 
 
@@ -12,6 +12,7 @@
 #   ANTHROPIC_API_KEY    Required if MFT_LLM_PROVIDER=anthropic_direct
 #   MFT_LLM_MODEL       Model name (default: claude-sonnet-4-5-20250514)
 #   MFT_API_PORT         API server port (default: 8000)
+#   MFT_SKIP_DOTENV      Set to 1 to skip loading .env (env vars injected directly)
 #   REACT_APP_API_URL    Frontend API URL (default: http://localhost:8000)
 
 set -e
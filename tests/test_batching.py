@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for mft_evals.batching.BatchedInferenceServer.
+
+Zero external dependencies — uses only stdlib unittest + mft_evals/batching.py.
+
+Usage:
+    python3 -m unittest tests.test_batching -v
+"""
+
+import asyncio
+import importlib.util
+import os
+import unittest
+
+_project_root = os.path.join(os.path.dirname(__file__), "..")
+
+# Load batching.py on its own (stdlib only) rather than through the
+# mft_evals package, which other suites stub out in sys.modules.
+_batching_spec = importlib.util.spec_from_file_location(
+    "_mft_evals_batching",
+    os.path.join(_project_root, "mft_evals", "batching.py"),
+)
+_batching_mod = importlib.util.module_from_spec(_batching_spec)
+_batching_spec.loader.exec_module(_batching_mod)
+
+BatchedInferenceServer = _batching_mod.BatchedInferenceServer
+
+
+def submit_all(batch_fn, items, **server_kwargs):
+    """Submit every item concurrently; return outputs (or exceptions) in order."""
+
+    async def main():
+        async with BatchedInferenceServer(batch_fn, **server_kwargs) as server:
+            return await asyncio.gather(
+                *(server.submit(item) for item in items), return_exceptions=True
+            )
+
+    # A private loop: other suites rely on asyncio.get_event_loop() still
+    # returning the default loop, which asyncio.run() would unset
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+
+class TestBatchedInferenceServer(unittest.TestCase):
+
+    def test_groups_concurrent_calls_up_to_max_batch(self):
+        batch_sizes = []
+
+        def double(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        outputs = submit_all(double, range(10), max_batch=4, flush_ms=20)
+
+        self.assertEqual(outputs, [i * 2 for i in range(10)])
+        self.assertEqual(batch_sizes, [4, 4, 2])
+
+    def test_partial_batch_flushes_after_window(self):
+        outputs = submit_all(lambda items: items, ["x"], max_batch=32, flush_ms=10)
+        self.assertEqual(outputs, ["x"])
+
+    def test_async_batch_fn(self):
+        async def upper(items):
+            await asyncio.sleep(0)
+            return [item.upper() for item in items]
+
+        self.assertEqual(submit_all(upper, ["a", "b"], flush_ms=5), ["A", "B"])
+
+    def test_batch_error_reaches_every_caller(self):
+        def fail(items):
+            raise RuntimeError("ranker down")
+
+        outputs = submit_all(fail, [1, 2], flush_ms=5)
+        self.assertTrue(all(isinstance(o, RuntimeError) for o in outputs))
+
+    def test_wrong_output_count_is_an_error(self):
+        outputs = submit_all(lambda items: items[:1], [1, 2], flush_ms=5)
+        self.assertTrue(all(isinstance(o, ValueError) for o in outputs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for mft_evals.cache.ModelOutputCache.
+
+Zero external dependencies — uses only stdlib unittest + mft_evals/cache.py.
+
+Usage:
+    python3 -m unittest tests.test_cache -v
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+_project_root = os.path.join(os.path.dirname(__file__), "..")
+
+# Load cache.py on its own (stdlib only) rather than through the mft_evals
+# package, which other suites stub out in sys.modules.
+_cache_spec = importlib.util.spec_from_file_location(
+    "_mft_evals_cache",
+    os.path.join(_project_root, "mft_evals", "cache.py"),
+)
+_cache_mod = importlib.util.module_from_spec(_cache_spec)
+_cache_spec.loader.exec_module(_cache_mod)
+
+ModelOutputCache = _cache_mod.ModelOutputCache
+
+
+class TestModelOutputCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.db")
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def model(self, query):
+        self.calls.append(query)
+        return {"label": "relevant", "query": query}
+
+    def test_second_call_is_served_from_cache(self):
+        cache = ModelOutputCache(self.model, version="1", path=self.path)
+        first = cache("running shoes")
+        second = cache("running shoes")
+        cache.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, ["running shoes"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_persists_across_instances(self):
+        ModelOutputCache(self.model, version="1", path=self.path)("laptop")
+        cache = ModelOutputCache(self.model, version="1", path=self.path)
+        self.assertEqual(cache("laptop")["query"], "laptop")
+        cache.close()
+        self.assertEqual(self.calls, ["laptop"])
+
+    def test_new_version_misses(self):
+        ModelOutputCache(self.model, version="1", path=self.path)("laptop")
+        ModelOutputCache(self.model, version="2", path=self.path)("laptop")
+        self.assertEqual(self.calls, ["laptop", "laptop"])
+
+    def test_non_json_output_is_not_cached(self):
+        cache = ModelOutputCache(lambda q: {q}, path=self.path)
+        self.assertEqual(cache("x"), {"x"})
+        self.assertEqual(cache("x"), {"x"})
+        self.assertEqual(cache.hits, 0)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM client helpers in api/llm.py.
+
+Covers:
+  - _recover_truncated_json (JSON cut off at max_tokens)
+  - MetricSuggestion.measurement (method IDs match the prompt table;
+    unknown IDs are dropped)
+  - _provider_error (HTTP status -> typed error -> API status)
+  - Structured output (tools / response_format payloads, forced tool replies)
+  - _post_with_retry (attempt count, Retry-After, backoff cap, no retry on 4xx)
+  - _stream_chat_completion (SSE frame shapes, retry before the stream starts)
+
+Needs the API dependencies (pip install -r api/requirements.txt); skipped
+without them. No network access — provider calls go to a mock transport.
+
+Usage:
+    python3 -m unittest tests.test_llm -v
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from typing import get_args
+from unittest import mock
+
+_project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_project_root))
+os.environ.setdefault("MFT_SKIP_DOTENV", "1")
+
+try:
+    import httpx
+    import orjson
+    from api import llm
+    from api.schema import MeasurementID, MetricsResponse, MetricSuggestion
+    from api.system_prompt import MEASUREMENT_METHODS
+    from pydantic import ValidationError
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise unittest.SkipTest(f"API dependencies not installed: {e}")
+
+
+def _metrics_payload() -> str:
+    return orjson.dumps({
+        "message": 'Breakdown with "quotes", [brackets] and {braces}',
+        "eval_name": "payment_extraction_eval",
+        "metrics": [
+            {
+                "field": f"Metric {i}",
+                "measurement": ["exact_match_ratio"],
+                "description": "One-line description",
+                "baseline": 80,
+                "target": 95,
+                "rationale": "Why.",
+            }
+            for i in range(3)
+        ],
+    }).decode()
+
+
+class MockProviderTestCase(unittest.TestCase):
+    """Routes provider calls to an httpx.MockTransport, with backoff sleeps recorded."""
+
+    URL = "https://llm.test/v1/chat/completions"
+    HEADERS = {"Content-Type": "application/json"}
+
+    def setUp(self):
+        self.requests = []
+        self.responses = []
+        self.sleep = mock.AsyncMock()
+        patcher = mock.patch.object(llm.asyncio, "sleep", self.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    def call(self, fn, *args):
+        async def main():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(self._handler)) as client:
+                with mock.patch.object(llm, "get_client", return_value=client):
+                    return await fn(*args)
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(main())
+        finally:
+            loop.close()
+
+
+def _sse(*frames: dict) -> bytes:
+    lines = [b"data: " + orjson.dumps(f) for f in frames] + [b"data: [DONE]"]
+    return b"\n\n".join(lines) + b"\n\n"
+
+
+class TestRecoverTruncatedJson(unittest.TestCase):
+
+    def test_complete_object_is_not_recovered(self):
+        self.assertIsNone(llm._recover_truncated_json('{"a": 1}'))
+
+    def test_drops_partial_array_element(self):
+        self.assertEqual(
+            llm._recover_truncated_json('{"metrics": [{"a": 1}, {"fie'),
+            {"metrics": [{"a": 1}]},
+        )
+
+    def test_strings_with_escaped_quotes_and_brackets(self):
+        text = r'{"a": "say \"hi\" ] } [", "b": "x\\", "c": "open'
+        self.assertEqual(llm._recover_truncated_json(text), {"a": 'say "hi" ] } [', "b": "x\\"})
+
+    def test_nested_arrays_keep_complete_elements(self):
+        self.assertEqual(
+            llm._recover_truncated_json('{"a": 1, "b": [[1, 2], [3, 4], [5'),
+            {"a": 1, "b": [[1, 2], [3, 4]]},
+        )
+
+    def test_cut_inside_key(self):
+        self.assertEqual(llm._recover_truncated_json('{"a": "x", "bee'), {"a": "x"})
+
+    def test_cut_inside_value(self):
+        self.assertEqual(llm._recover_truncated_json('{"a": "x", "b": "half a val'), {"a": "x"})
+        # A number may itself be cut short (123 -> 12), so it is dropped too
+        self.assertEqual(llm._recover_truncated_json('{"a": "x", "b": 12'), {"a": "x"})
+
+    def test_partial_nested_object_is_dropped(self):
+        self.assertEqual(
+            llm._recover_truncated_json('{"a": "x", "config": {"k": 1, "j'),
+            {"a": "x"},
+        )
+
+    def test_empty_container_is_dropped(self):
+        self.assertEqual(llm._recover_truncated_json('{"a": "x", "b": ['), {"a": "x"})
+
+    def test_nothing_complete_is_none(self):
+        self.assertIsNone(llm._recover_truncated_json('{"message": "cut he'))
+
+    def test_recovered_metrics_validate(self):
+        payload = _metrics_payload()
+        original = orjson.loads(payload)
+        first_metric_end = payload.index('"Why."}') + len('"Why."}')
+
+        for cut in range(1, len(payload)):
+            with self.subTest(cut=cut):
+                recovered = llm._recover_truncated_json(payload[:cut])
+                if recovered is None:
+                    continue
+                # Whatever is kept is exactly what the model wrote
+                for key, value in recovered.items():
+                    if key == "metrics":
+                        self.assertEqual(value, original["metrics"][:len(value)])
+                    else:
+                        self.assertEqual(value, original[key])
+                if cut > first_metric_end:
+                    MetricsResponse.model_validate(recovered)
+
+    def test_parse_json_response_uses_recovery(self):
+        payload = _metrics_payload()
+        data = llm._parse_json_response(payload[:payload.rindex("{") + 5])
+        self.assertEqual(len(MetricsResponse.model_validate(data).metrics), 2)
+
+
+def _metric(measurement) -> dict:
+    return {
+        "field": "Amount Accuracy",
+        "measurement": measurement,
+        "description": "Extracted amount matches",
+        "baseline": 80,
+        "target": 95,
+        "rationale": "Why.",
+    }
+
+
+class TestMeasurementIDs(unittest.TestCase):
+
+    def test_literal_matches_prompt_table(self):
+        self.assertEqual(list(get_args(MeasurementID)), list(MEASUREMENT_METHODS))
+
+    def test_known_ids_are_kept(self):
+        metric = MetricSuggestion.model_validate(_metric(["exact_match_ratio", "fuzzy_string_match"]))
+        self.assertEqual(metric.measurement, ["exact_match_ratio", "fuzzy_string_match"])
+
+    def test_unknown_ids_are_dropped(self):
+        with self.assertLogs("api.schema", "WARNING"):
+            metric = MetricSuggestion.model_validate(_metric(["bleu", "exact_match_ratio", 7]))
+        self.assertEqual(metric.measurement, ["exact_match_ratio"])
+
+    def test_only_unknown_ids_is_an_error(self):
+        with self.assertRaises(ValidationError):
+            MetricSuggestion.model_validate(_metric(["bleu"]))
+
+    def test_instructions_that_can_emit_metrics_list_the_ids(self):
+        ids = ", ".join(MEASUREMENT_METHODS)
+        instructions = {
+            "metrics": llm._METRICS_SCHEMA_TMPL.format(description="x"),
+            "chat": llm._CHAT_SCHEMA_TMPL.format(context="x", config_json="{}"),
+            "measurement description": MetricSuggestion.model_fields["measurement"].description,
+        }
+        for name, text in instructions.items():
+            with self.subTest(name):
+                self.assertIn(ids, text)
+
+    def test_json_schema_keeps_the_enum(self):
+        schema = MetricsResponse.model_json_schema()
+        items = schema["$defs"]["MetricSuggestion"]["properties"]["measurement"]["items"]
+        self.assertEqual(items["enum"], list(MEASUREMENT_METHODS))
+
+
+class TestProviderError(unittest.TestCase):
+
+    def test_status_mapping(self):
+        cases = [
+            (429, llm.RateLimited, 429),
+            (500, llm.ProviderUnavailable, 503),
+            (529, llm.ProviderUnavailable, 503),
+            (400, llm.BadRequest, 502),
+        ]
+        for status, error_cls, api_status in cases:
+            with self.subTest(status=status):
+                response = httpx.Response(status, text="detail", headers={"Retry-After": "7"})
+                error = llm._provider_error(response)
+                self.assertIs(type(error), error_cls)
+                self.assertEqual(error.status_code, status)
+                self.assertEqual(error.api_status, api_status)
+                self.assertEqual(error.detail, "detail")
+                self.assertEqual(isinstance(error, llm._RETRYABLE_ERRORS), status != 400)
+
+    def test_retry_after_is_kept_only_for_retryable_errors(self):
+        headers = {"Retry-After": "7"}
+        self.assertEqual(llm._provider_error(httpx.Response(429, headers=headers)).retry_after, "7")
+        self.assertIsNone(llm._provider_error(httpx.Response(400, headers=headers)).retry_after)
+
+
+class TestPostWithRetry(MockProviderTestCase):
+
+    def post(self):
+        return self.call(llm._post_with_retry, self.URL, self.HEADERS, {"model": "m"})
+
+    def delays(self):
+        return [c.args[0] for c in self.sleep.await_args_list]
+
+    def test_gives_up_after_max_retries(self):
+        self.responses = [httpx.Response(503, text="unavailable")]
+        with mock.patch.object(llm, "LLM_MAX_RETRIES", 3):
+            with self.assertRaises(llm.ProviderUnavailable):
+                self.post()
+        self.assertEqual(len(self.requests), 4)
+        self.assertEqual(self.sleep.await_count, 3)
+
+    def test_success_after_retry(self):
+        self.responses = [httpx.Response(429, text="slow down"), httpx.Response(200, json={"ok": True})]
+        self.assertEqual(self.post().json(), {"ok": True})
+        self.assertEqual(len(self.requests), 2)
+
+    def test_numeric_retry_after_is_used(self):
+        self.responses = [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json={}),
+        ]
+        self.post()
+        self.assertEqual(self.delays(), [2.0])
+
+    def test_delay_is_capped(self):
+        self.responses = [
+            httpx.Response(429, headers={"Retry-After": "100"}),
+            httpx.Response(503),
+            httpx.Response(503),
+            httpx.Response(200, json={}),
+        ]
+        with mock.patch.object(llm, "LLM_MAX_RETRIES", 5), \
+                mock.patch.object(llm, "LLM_RETRY_MAX_DELAY", 1.5):
+            self.post()
+        self.assertEqual(self.delays()[0], 1.5)
+        # Exponential backoff is capped too; jitter adds at most one second
+        for delay in self.delays()[1:]:
+            self.assertLess(delay, 2.5)
+
+    def test_bad_request_is_never_retried(self):
+        self.responses = [httpx.Response(400, text="invalid model")]
+        with self.assertRaises(llm.BadRequest) as ctx:
+            self.post()
+        self.assertEqual(len(self.requests), 1)
+        self.sleep.assert_not_awaited()
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class TestStructuredOutput(MockProviderTestCase):
+
+    SYSTEM = "system"
+    MESSAGES = [{"role": "user", "content": "hi"}]
+
+    def sent_payload(self, call, structured: bool, response_model=MetricsResponse) -> dict:
+        self.requests.clear()
+        with mock.patch.object(llm, "STRUCTURED_OUTPUT", structured), \
+                mock.patch.object(llm, "LLM_STREAM", False):
+            self.call(call, self.SYSTEM, self.MESSAGES, "", response_model)
+        return orjson.loads(self.requests[0].content)
+
+    def test_anthropic_forced_tool(self):
+        self.responses = [httpx.Response(200, json={"content": [{"type": "text", "text": "{}"}]})]
+
+        payload = self.sent_payload(llm._call_anthropic, structured=True)
+        self.assertEqual(payload["tool_choice"], {"type": "tool", "name": "MetricsResponse"})
+        tools = {tool["name"]: tool for tool in payload["tools"]}
+        self.assertEqual(set(tools), {"RefinedPromptResponse", "MetricsResponse", "ChatResponse"})
+        self.assertEqual(tools["MetricsResponse"]["input_schema"], MetricsResponse.model_json_schema())
+
+        # The tool list is the same whichever model is forced, so the cached prefix holds
+        other = self.sent_payload(llm._call_anthropic, structured=True, response_model=llm.ChatResponse)
+        self.assertEqual(other["tools"], payload["tools"])
+        self.assertEqual(other["tool_choice"]["name"], "ChatResponse")
+
+    def test_openai_response_format(self):
+        self.responses = [httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})]
+
+        payload = self.sent_payload(llm._call_openai, structured=True)
+        self.assertEqual(payload["response_format"], {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "MetricsResponse",
+                "schema": MetricsResponse.model_json_schema(),
+                "strict": False,
+            },
+        })
+        self.assertEqual(
+            self.sent_payload(llm._call_llama_native, structured=True)["response_format"],
+            payload["response_format"],
+        )
+
+    def test_flag_off_sends_no_schema(self):
+        self.responses = [httpx.Response(200, json={
+            "content": [{"type": "text", "text": "{}"}],
+            "choices": [{"message": {"content": "{}"}}],
+        })]
+        for call in (llm._call_anthropic, llm._call_openai, llm._call_llama_native):
+            with self.subTest(call=call):
+                payload = self.sent_payload(call, structured=False)
+                self.assertFalse({"tools", "tool_choice", "response_format"} & set(payload))
+
+    def test_no_response_model_sends_no_schema(self):
+        self.responses = [httpx.Response(200, json={"content": [{"type": "text", "text": "{}"}]})]
+        payload = self.sent_payload(llm._call_anthropic, structured=True, response_model=None)
+        self.assertFalse({"tools", "tool_choice"} & set(payload))
+
+    def test_forced_tool_reply_is_reencoded_and_validated(self):
+        metrics = orjson.loads(_metrics_payload())
+        self.responses = [httpx.Response(200, json={"content": [
+            {"type": "text", "text": "Here you go."},
+            {"type": "tool_use", "id": "toolu_1", "name": "MetricsResponse", "input": metrics},
+        ]})]
+        request = llm.GenerateMetricsRequest(description="Extract payment fields")
+        with mock.patch.object(llm, "STRUCTURED_OUTPUT", True), \
+                mock.patch.object(llm, "_CALL_PROVIDER", llm._call_anthropic):
+            result = self.call(llm.generate_metrics, request)
+
+        self.assertIsInstance(result, MetricsResponse)
+        self.assertEqual(result, MetricsResponse.model_validate(metrics))
+        sent = orjson.loads(self.requests[0].content)
+        self.assertEqual(sent["tool_choice"]["name"], "MetricsResponse")
+
+
+class TestStreamChatCompletion(MockProviderTestCase):
+
+    def stream(self):
+        return self.call(llm._stream_chat_completion, self.URL, self.HEADERS, {"stream": True})
+
+    def test_openai_delta_frames(self):
+        self.responses = [httpx.Response(200, content=_sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hello"}}]},
+            {"choices": [{"delta": {"content": ", world"}}]},
+            {"choices": [{"delta": {}, "finish_reason": "stop"}]},
+        ))]
+        self.assertEqual(self.stream(), "Hello, world")
+
+    def test_llama_event_frames(self):
+        self.responses = [httpx.Response(200, content=_sse(
+            {"event": {"event_type": "start", "delta": {"type": "text", "text": ""}}},
+            {"event": {"event_type": "progress", "delta": {"type": "text", "text": "Hello"}}},
+            {"event": {"event_type": "progress", "delta": {"type": "text", "text": ", world"}}},
+            {"event": {"event_type": "metrics"}},
+        ))]
+        self.assertEqual(self.stream(), "Hello, world")
+
+    def test_error_status_is_retried_before_the_stream_starts(self):
+        self.responses = [
+            httpx.Response(503, text="overloaded"),
+            httpx.Response(200, content=_sse({"choices": [{"delta": {"content": "ok"}}]})),
+        ]
+        self.assertEqual(self.stream(), "ok")
+        self.assertEqual(len(self.requests), 2)
+        self.sleep.assert_awaited_once()
+
+    def test_bad_request_is_not_retried(self):
+        self.responses = [httpx.Response(400, text="bad")]
+        with self.assertRaises(llm.BadRequest):
+            self.stream()
+        self.assertEqual(len(self.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
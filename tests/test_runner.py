@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Tests for mft_evals.runner (EvalRunner, SimpleEvalRunner).
+
+Zero external dependencies — uses only stdlib unittest + the mft_evals
+package (pyyaml is only needed for YAML configs, which these don't use).
+
+Usage:
+    python3 -m unittest tests.test_runner -v
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+_project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, _project_root)
+
+from mft_evals.dataset import Dataset  # noqa: E402
+from mft_evals.eval import Eval  # noqa: E402
+from mft_evals.runner import EvalRunner, SimpleEvalRunner  # noqa: E402
+from mft_evals.scorers import ExactMatchScorer  # noqa: E402
+
+QUERIES = ["running shoes", "laptop", "headphones", "winter jacket", "pizza"]
+
+
+def make_eval() -> Eval:
+    dataset = Dataset.from_list([{"input": q, "expected": q.upper()} for q in QUERIES])
+    return Eval(
+        name="runner_test",
+        dataset=dataset,
+        scorers=[ExactMatchScorer(name="exact")],
+        thresholds={"exact": 0.5},
+    )
+
+
+def make_runner(**kwargs) -> EvalRunner:
+    # A mock logger keeps Scuba events out of ~/.mft_evals/events.jsonl
+    return EvalRunner(make_eval(), scuba_logger=mock.Mock(), **kwargs)
+
+
+class RecordingModel:
+    """generate_fn that records its inputs."""
+
+    def __init__(self, transform=str.upper):
+        self.calls = []
+        self.transform = transform
+
+    def __call__(self, query):
+        self.calls.append(query)
+        return self.transform(query)
+
+
+def mixed_case(query):
+    """Uppercases every other query, so some rows pass and some fail."""
+    return query.upper() if QUERIES.index(query) % 2 == 0 else query
+
+
+def run_async(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def slow_upper(query):
+    """Later rows finish first, so completion order differs from dataset order."""
+    time.sleep(0.002 * (len(QUERIES) - QUERIES.index(query)))
+    return query.upper()
+
+
+def make_simple_runner() -> SimpleEvalRunner:
+    return SimpleEvalRunner(
+        test_cases=[{"input": q, "expected": q.upper()} for q in QUERIES],
+        scorer=ExactMatchScorer(),
+    )
+
+
+class TestEvalRunnerThreadPool(unittest.TestCase):
+
+    def test_outputs_keep_dataset_order(self):
+        results = make_runner().run(generate_fn=slow_upper, max_workers=4)
+        self.assertEqual([r["actual"] for r in results.detailed_results], [q.upper() for q in QUERIES])
+        self.assertEqual(results.num_passed, len(QUERIES))
+
+    def test_generate_fn_runs_on_the_pool(self):
+        threads = set()
+
+        def generate(query):
+            threads.add(threading.current_thread().name)
+            return query.upper()
+
+        make_runner().run(generate_fn=generate, max_workers=2)
+        self.assertNotIn(threading.main_thread().name, threads)
+
+    def test_scores_match_sequential_run(self):
+        sequential = make_runner().run(generate_fn=mixed_case)
+        pooled = make_runner().run(generate_fn=mixed_case, max_workers=3)
+        self.assertEqual(pooled.metrics, sequential.metrics)
+        self.assertEqual(pooled.detailed_results, sequential.detailed_results)
+
+    def test_with_cache_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            runner = make_runner(cache_path=os.path.join(tmp_dir, "cache.db"))
+            model = RecordingModel()
+            lock = threading.Lock()
+
+            def generate(query):
+                with lock:
+                    return model(query)
+
+            first = runner.run(generate_fn=generate, max_workers=4, cache_version="v1")
+            second = runner.run(generate_fn=generate, max_workers=4, cache_version="v1")
+
+        self.assertEqual(sorted(model.calls), sorted(QUERIES))
+        self.assertEqual(first.detailed_results, second.detailed_results)
+        self.assertEqual([r["actual"] for r in second.detailed_results], [q.upper() for q in QUERIES])
+
+
+class TestSimpleEvalRunnerThreadPool(unittest.TestCase):
+
+    def test_outputs_keep_dataset_order(self):
+        results = make_simple_runner().run(model_fn=slow_upper, max_workers=4)
+        self.assertEqual(results["num_passed"], len(QUERIES))
+
+    def test_errors_become_outputs_under_the_pool(self):
+        def flaky(query):
+            if query == "laptop":
+                raise RuntimeError("timeout")
+            return query.upper()
+
+        sequential = make_simple_runner().run(model_fn=flaky)
+        pooled = make_simple_runner().run(model_fn=flaky, max_workers=4)
+
+        self.assertEqual(pooled, sequential)
+        self.assertEqual(pooled["num_passed"], len(QUERIES) - 1)
+        [failure] = pooled["failures"]
+        self.assertEqual(failure["input"], "laptop")
+        self.assertEqual(failure["actual"], "ERROR: timeout")
+
+
+class TestSimpleEvalRunnerBatch(unittest.TestCase):
+
+    def test_batch_fn_is_called_once_with_all_inputs(self):
+        batch_fn = mock.Mock(side_effect=lambda inputs: [q.upper() for q in inputs])
+        results = make_simple_runner().run(batch_fn=batch_fn)
+
+        batch_fn.assert_called_once_with(QUERIES)
+        self.assertEqual(results["num_passed"], len(QUERIES))
+        self.assertEqual(results, make_simple_runner().run(model_fn=str.upper))
+
+    def test_batch_fn_takes_precedence_over_model_fn(self):
+        model_fn = mock.Mock(return_value="")
+        make_simple_runner().run(model_fn=model_fn, batch_fn=lambda inputs: inputs)
+        model_fn.assert_not_called()
+
+    def test_length_mismatch_raises(self):
+        for outputs in ([], ["X"] * (len(QUERIES) - 1), ["X"] * (len(QUERIES) + 1)):
+            with self.subTest(num_outputs=len(outputs)):
+                with self.assertRaises(ValueError):
+                    make_simple_runner().run(batch_fn=lambda inputs, outputs=outputs: outputs)
+
+    def test_batch_error_fails_every_row(self):
+        def batch_fn(inputs):
+            raise RuntimeError("endpoint down")
+
+        results = make_simple_runner().run(batch_fn=batch_fn)
+        self.assertEqual(results["num_passed"], 0)
+        self.assertTrue(all(f["actual"] == "ERROR: endpoint down" for f in results["failures"]))
+
+
+class TestEvalRunnerArun(unittest.TestCase):
+
+    def test_results_keep_dataset_order(self):
+        async def agenerate(query):
+            # Later rows finish first
+            await asyncio.sleep(0.001 * (len(QUERIES) - QUERIES.index(query)))
+            return query.upper()
+
+        results = run_async(make_runner().arun(agenerate))
+        self.assertEqual([r["actual"] for r in results.detailed_results], [q.upper() for q in QUERIES])
+
+    def test_max_concurrency_bounds_in_flight_calls(self):
+        in_flight = peak = 0
+
+        async def agenerate(query):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return query.upper()
+
+        run_async(make_runner().arun(agenerate, max_concurrency=2))
+        self.assertEqual(peak, 2)
+
+    def test_scores_match_run(self):
+        async def agenerate(query):
+            return mixed_case(query)
+
+        sync_results = make_runner().run(generate_fn=mixed_case)
+        async_results = run_async(make_runner().arun(agenerate))
+
+        self.assertEqual(async_results.metrics, sync_results.metrics)
+        self.assertEqual(async_results.num_passed, sync_results.num_passed)
+        self.assertEqual(async_results.detailed_results, sync_results.detailed_results)
+
+    def test_invalid_max_concurrency_is_rejected_up_front(self):
+        scuba = mock.Mock()
+        runner = EvalRunner(make_eval(), scuba_logger=scuba)
+        agenerate = mock.AsyncMock()
+        for value in (0, -1):
+            with self.subTest(max_concurrency=value):
+                with self.assertRaises(ValueError):
+                    run_async(runner.arun(agenerate, max_concurrency=value))
+        agenerate.assert_not_awaited()
+        scuba.log_eval_run_started.assert_not_called()
+
+
+class TestEvalRunnerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_version_is_served_from_cache(self):
+        model = RecordingModel()
+        runner = make_runner(cache_path=self.cache_path)
+        first = runner.run(generate_fn=model, cache_version="v1")
+        second = runner.run(generate_fn=model, cache_version="v1")
+
+        self.assertEqual(model.calls, QUERIES)
+        self.assertEqual(first.primary_score, second.primary_score)
+
+    def test_changed_version_misses(self):
+        old_model = RecordingModel()
+        new_model = RecordingModel(transform=str.lower)
+        runner = make_runner(cache_path=self.cache_path)
+        runner.run(generate_fn=old_model, cache_version="v1")
+        results = runner.run(generate_fn=new_model, cache_version="v2")
+
+        self.assertEqual(new_model.calls, QUERIES)
+        self.assertEqual(results.num_passed, 0)
+
+    def test_model_version_is_used_by_default(self):
+        model = RecordingModel()
+        model.version = "1.0"
+        runner = make_runner(cache_path=self.cache_path)
+        runner.run(model=model)
+        runner.run(model=model)
+        self.assertEqual(model.calls, QUERIES)
+
+    def test_cache_requires_a_version(self):
+        runner = make_runner(cache_path=self.cache_path)
+        with self.assertRaises(ValueError):
+            runner.run(generate_fn=RecordingModel())
+
+    def test_pregenerated_outputs_need_no_version(self):
+        results = make_runner(cache_path=self.cache_path).run()
+        self.assertEqual(results.num_examples, len(QUERIES))
+
+
+if __name__ == "__main__":
+    unittest.main()
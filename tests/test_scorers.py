@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for mft_evals.scorers.
+
+Zero external dependencies — uses only stdlib unittest + the mft_evals
+package.
+
+Usage:
+    python3 -m unittest tests.test_scorers -v
+"""
+
+import os
+import sys
+import unittest
+
+_project_root = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, _project_root)
+
+from mft_evals.scorers import (  # noqa: E402
+    CompositeScorer,
+    ExactMatchScorer,
+    NumericToleranceScorer,
+    TokenF1Scorer,
+)
+
+ROWS = [
+    (
+        {"txn_id": "TXN123", "amount": 123.45, "merchant": "STARBUCKS COFFEE #1234"},
+        {"txn_id": "TXN123", "amount": 123.46, "merchant": "Starbucks Coffee"},
+    ),
+    (
+        {"txn_id": "TXN456", "amount": 10.0, "merchant": "Amazon"},
+        {"txn_id": "TXN999", "amount": 12.0, "merchant": "Amazon Marketplace"},
+    ),
+    (
+        {"txn_id": "TXN789", "amount": 0.0, "merchant": "Uber"},
+        {"txn_id": "TXN789", "amount": 0.0, "merchant": "Lyft"},
+    ),
+]
+
+
+def make_composite(**kwargs) -> CompositeScorer:
+    return CompositeScorer(
+        [
+            (ExactMatchScorer(field="txn_id"), 0.3),
+            (NumericToleranceScorer(field="amount", tolerance=0.01), 0.25),
+            (TokenF1Scorer(field="merchant"), 0.15),
+        ],
+        **kwargs,
+    )
+
+
+class TestCompositeScorer(unittest.TestCase):
+
+    def test_thread_pool_matches_sequential(self):
+        sequential = make_composite()
+        with make_composite(max_workers=3) as pooled:
+            for expected, actual in ROWS:
+                with self.subTest(expected=expected):
+                    a = sequential.score(expected, actual)
+                    b = pooled.score(expected, actual)
+                    self.assertEqual(a.score, b.score)
+                    self.assertEqual(a.passed, b.passed)
+                    self.assertEqual(a.details["component_scores"], b.details["component_scores"])
+                    self.assertEqual(a.details["weights"], b.details["weights"])
+
+    def test_pool_is_reused_across_rows(self):
+        scorer = make_composite(max_workers=2)
+        self.assertIsNone(scorer._pool)
+        scorer.score(*ROWS[0])
+        pool = scorer._pool
+        scorer.score(*ROWS[1])
+        self.assertIs(scorer._pool, pool)
+
+        scorer.close()
+        self.assertIsNone(scorer._pool)
+        # Still usable after close(); a new pool is started on demand
+        self.assertEqual(scorer.score(*ROWS[0]).score, make_composite().score(*ROWS[0]).score)
+        scorer.close()
+
+    def test_no_pool_without_max_workers(self):
+        scorer = make_composite()
+        scorer.score(*ROWS[0])
+        self.assertIsNone(scorer._pool)
+
+    def test_weights_are_normalized(self):
+        weights = make_composite().score(*ROWS[0]).details["weights"]
+        self.assertAlmostEqual(sum(weights.values()), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
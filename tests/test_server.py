@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the FastAPI endpoints in api/server.py.
+
+Needs the API dependencies (pip install -r api/requirements.txt); skipped
+without them. The app lifespan (database, HTTP client) is not started, and
+LLM handlers are patched, so nothing leaves the process.
+
+Usage:
+    python3 -m unittest tests.test_server -v
+"""
+
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+_project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_project_root))
+os.environ.setdefault("MFT_SKIP_DOTENV", "1")
+
+try:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api import llm, server
+    from api.schema import ChatRequest, GenerateMetricsRequest, ValidateMetricsRequest
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise unittest.SkipTest(f"API dependencies not installed: {e}")
+
+
+JSON_BODY_ROUTES = {
+    "/api/chat": ChatRequest,
+    "/api/generate-metrics": GenerateMetricsRequest,
+    "/api/validate-metrics": ValidateMetricsRequest,
+}
+
+
+def _typed_body_app() -> FastAPI:
+    """The same routes with FastAPI parsing a typed body, as before _json_body."""
+    app = FastAPI()
+    for path, model in JSON_BODY_ROUTES.items():
+        async def endpoint(request: model):  # type: ignore[valid-type]
+            return {}
+        app.post(path)(endpoint)
+    return app
+
+
+class TestJsonBody(unittest.TestCase):
+
+    INVALID_BODIES = [
+        {},
+        [1],
+        "not an object",
+        {"phase": "nope", "message": "x"},
+        {"phase": "objective", "message": 5},
+        {"phase": "objective", "message": "x", "conversation_history": [{"role": 1}]},
+        {"description": None, "conversation_history": "x"},
+        {"metrics": [{"name": 1}], "dataset": "x"},
+    ]
+    INVALID_RAW_BODIES = [b"", b"{bad", b'{"message": "x",}']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(server.app)
+        cls.reference = TestClient(_typed_body_app())
+
+    def assert_same_422(self, path, **kwargs):
+        response = self.client.post(path, **kwargs)
+        expected = self.reference.post(path, **kwargs)
+        self.assertEqual(expected.status_code, 422)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json(), expected.json())
+
+    def test_validation_errors_match_typed_body(self):
+        for path in JSON_BODY_ROUTES:
+            for body in self.INVALID_BODIES:
+                with self.subTest(path=path, body=body):
+                    self.assert_same_422(path, json=body)
+            for raw in self.INVALID_RAW_BODIES:
+                with self.subTest(path=path, raw=raw):
+                    self.assert_same_422(path, content=raw, headers={"Content-Type": "application/json"})
+
+    def test_openapi_documents_request_bodies(self):
+        schema = server.app.openapi()
+        reference = _typed_body_app().openapi()
+        components = schema["components"]["schemas"]
+        for path, model in JSON_BODY_ROUTES.items():
+            with self.subTest(path=path):
+                operation = schema["paths"][path]["post"]
+                expected = reference["paths"][path]["post"]
+                self.assertEqual(operation["requestBody"], expected["requestBody"])
+                self.assertEqual(operation["responses"]["422"], expected["responses"]["422"])
+                self.assertIn(model.__name__, components)
+
+        # Every $ref resolves to a registered component
+        refs = set()
+
+        def collect(node):
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    refs.add(node["$ref"].rsplit("/", 1)[-1])
+                for value in node.values():
+                    collect(value)
+            elif isinstance(node, list):
+                for value in node:
+                    collect(value)
+
+        collect(schema)
+        self.assertLessEqual(refs, set(components))
+
+
+class TestProviderErrorStatus(unittest.TestCase):
+
+    def setUp(self):
+        # Not used as a context manager, so the lifespan never runs
+        self.client = TestClient(server.app)
+
+    def test_generate_metrics_maps_provider_errors(self):
+        cases = [
+            (llm.RateLimited(429, "slow down"), 429),
+            (llm.ProviderUnavailable(529, "overloaded"), 503),
+            (llm.BadRequest(400, "bad model"), 502),
+        ]
+        for error, expected_status in cases:
+            with self.subTest(error=type(error).__name__):
+                with mock.patch.object(server, "generate_metrics", mock.AsyncMock(side_effect=error)):
+                    response = self.client.post("/api/generate-metrics", json={"description": "x"})
+                self.assertEqual(response.status_code, expected_status)
+                self.assertIn("LLM request failed", response.json()["detail"])
+
+
+def _metrics_reply(*measurements: list) -> str:
+    return json.dumps({
+        "message": "Here are your metrics",
+        "eval_name": "payment_extraction_eval",
+        "metrics": [
+            {"field": f"Metric {i}", "measurement": m, "description": "d",
+             "baseline": 80, "target": 95, "rationale": "r"}
+            for i, m in enumerate(measurements)
+        ],
+    })
+
+
+class TestGenerateMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+
+    def post(self, reply: str):
+        with mock.patch.object(llm, "_call_llm", mock.AsyncMock(return_value=reply)):
+            return self.client.post("/api/generate-metrics", json={"description": "x"})
+
+    def test_unknown_measurement_id_is_dropped(self):
+        with self.assertLogs("api.schema", "WARNING"):
+            response = self.post(_metrics_reply(["exact_match_ratio"], ["bleu", "fuzzy_string_match"]))
+        self.assertEqual(response.status_code, 200)
+        measurements = [m["measurement"] for m in response.json()["metrics"]]
+        self.assertEqual(measurements, [["exact_match_ratio"], ["fuzzy_string_match"]])
+
+    def test_metric_without_a_known_id_is_a_502(self):
+        response = self.post(_metrics_reply(["exact_match_ratio"], ["bleu"]))
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("LLM returned an invalid response", response.json()["detail"])
+
+
+def _run_row(run_id: str = "run-1") -> dict:
+    """A run as storage returns it: SQLite ints for bools, plus frontend keys."""
+    return {
+        "id": run_id,
+        "eval_id": "eval-1",
+        "status": "completed",
+        "primary_score": 0.5,
+        "passed_baseline": 1,
+        "passed_target": 0,
+        "passedBaseline": True,
+        "passedTarget": False,
+        "metrics": {"exact": 0.5},
+        "detailed_results": [
+            {"test_case_id": "test_0", "input": {"q": "a"}, "expected": "A", "actual": "A",
+             "scores": {"exact": 1.0}, "passed": True},
+            {"test_case_id": "test_1", "input": {"q": "b"}, "expected": "B", "actual": None,
+             "scores": {"exact": 0.0}, "passed": False, "extra": [1, 2]},
+        ],
+        "failures": [
+            {"test_case_id": "test_1", "input": {"q": "b"}, "expected": "B", "actual": None,
+             "scores": {"exact": 0.0}, "rationale": ""},
+        ],
+    }
+
+
+class TestListAndRunResponses(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_get_run_returns_the_stored_row(self):
+        row = _run_row()
+        with mock.patch.object(server, "db_get_run", return_value=row):
+            self.assertEqual(self.get("/api/runs/run-1"), {"run": row})
+
+    def test_missing_columns_are_not_filled_in(self):
+        row = _run_row()
+        del row["detailed_results"], row["failures"]
+        with mock.patch.object(server, "db_get_run", return_value=row):
+            run = self.get("/api/runs/run-1")["run"]
+        self.assertNotIn("detailed_results", run)
+        self.assertNotIn("failures", run)
+
+    def test_list_runs(self):
+        rows = [_run_row("run-1"), _run_row("run-2")]
+        with mock.patch.object(server, "db_list_runs", return_value=rows):
+            self.assertEqual(self.get("/api/evals/eval-1/runs"), {"runs": rows, "count": 2})
+
+    def test_list_runs_storage_error_is_a_500(self):
+        with mock.patch.object(server, "db_list_runs", side_effect=RuntimeError("db locked")):
+            response = self.client.get("/api/evals/eval-1/runs")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {"detail": "db locked"})
+
+    def test_list_evals(self):
+        evals = [{"id": "eval-1", "name": "a"}, {"id": "eval-2", "name": "b"}]
+        with mock.patch.object(server, "db_list", return_value=evals):
+            self.assertEqual(self.get("/api/evals"), {"evals": evals, "count": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
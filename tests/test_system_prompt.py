@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Stability tests for the LLM system prompt (api/system_prompt.py).
+
+Provider prompt caching only hits when the static prefix is byte-identical
+across requests and across worker processes. These tests pin that:
+  - SYSTEM_PROMPT and each phase's guidance match the committed golden hashes
+  - Prompt sizes stay within budget
+  - Prompt and phase appendices don't depend on hash seed (set/dict ordering)
+  - phase_appendix() is a pure function of its arguments
+  - Domain notes are sent only for the detected product area
+
+If you edit the prompt on purpose, regenerate the golden hashes (every
+change here starts provider prompt caches cold, so reviewers should see it):
+    python3 -c "import api.system_prompt as s; print(s.SYSTEM_PROMPT_SHA256)" \\
+        > tests/golden/system_prompt.sha256
+    python3 -c "import api.system_prompt as s; [print(f'{s.prompt_sha256(t)}  {p}') \\
+        for p, t in s.PHASE_APPENDIX.items()]" > tests/golden/phase_appendix.sha256
+
+Zero external dependencies — api.system_prompt imports only the stdlib.
+
+Usage:
+    python3 -m unittest tests.test_system_prompt -v
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+_project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_project_root))
+
+from api.system_prompt import (  # noqa: E402
+    DOMAIN_KNOWLEDGE,
+    EXAMPLES,
+    PHASE_APPENDIX,
+    PRODUCT_AREAS,
+    SYSTEM_PROMPT,
+    SYSTEM_PROMPT_SHA256,
+    detect_product_area,
+    phase_appendix,
+    prompt_sha256,
+)
+
+_GOLDEN_DIR = _project_root / "tests" / "golden"
+_GOLDEN_SHA = _GOLDEN_DIR / "system_prompt.sha256"
+_GOLDEN_PHASE_SHAS = _GOLDEN_DIR / "phase_appendix.sha256"
+
+# Size budgets in UTF-8 bytes (~4 bytes per token for this English prose, so
+# 12KB is ~3k tokens). The static prefix is paid on every call, cached or not;
+# the appendix is checked in its largest form (longest example + product area).
+SYSTEM_PROMPT_MAX_BYTES = 12_000
+PHASE_APPENDIX_MAX_BYTES = 6_000
+
+# Prints a fingerprint of everything the prompt builder produces
+_FINGERPRINT_SCRIPT = """
+import api.system_prompt as s
+parts = [s.SYSTEM_PROMPT] + [s.phase_appendix(p, "payment fraud refund") for p in s.PHASE_APPENDIX]
+print(s.prompt_sha256("\\x00".join(parts)))
+"""
+
+
+def _fingerprint_with_seed(seed: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", _FINGERPRINT_SCRIPT],
+        cwd=_project_root,
+        env={**os.environ, "PYTHONHASHSEED": seed},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+class TestSystemPromptStability(unittest.TestCase):
+
+    def test_matches_golden_hash(self):
+        self.assertEqual(SYSTEM_PROMPT_SHA256, _GOLDEN_SHA.read_text().strip())
+
+    def test_phase_guidance_matches_golden_hashes(self):
+        golden = {}
+        for line in _GOLDEN_PHASE_SHAS.read_text().splitlines():
+            sha, phase = line.split()
+            golden[phase] = sha
+        self.assertEqual(golden, {phase: prompt_sha256(text) for phase, text in PHASE_APPENDIX.items()})
+
+    def test_sha_is_of_prompt(self):
+        self.assertEqual(SYSTEM_PROMPT_SHA256, prompt_sha256(SYSTEM_PROMPT))
+
+    def test_independent_of_hash_seed(self):
+        self.assertEqual(_fingerprint_with_seed("1"), _fingerprint_with_seed("2"))
+
+    def test_phase_appendix_is_pure(self):
+        for phase in PHASE_APPENDIX:
+            with self.subTest(phase=phase):
+                self.assertEqual(
+                    phase_appendix(phase, "payment extraction"),
+                    phase_appendix(phase, "payment extraction"),
+                )
+
+    def test_system_prompt_within_budget(self):
+        self.assertLessEqual(len(SYSTEM_PROMPT.encode("utf-8")), SYSTEM_PROMPT_MAX_BYTES)
+
+    def test_phase_appendix_within_budget(self):
+        for phase in PHASE_APPENDIX:
+            with self.subTest(phase=phase):
+                largest = max(
+                    len(phase_appendix(phase, example, area).encode("utf-8"))
+                    for example in EXAMPLES
+                    for area in (None, *PRODUCT_AREAS)
+                )
+                self.assertLessEqual(largest, PHASE_APPENDIX_MAX_BYTES)
+
+    def test_prefix_has_no_phase_guidance(self):
+        self.assertNotIn("## CURRENT PHASE", SYSTEM_PROMPT)
+        self.assertNotIn("## EXAMPLE\n", SYSTEM_PROMPT)
+
+
+class TestProductArea(unittest.TestCase):
+
+    def test_detects_area_from_keywords(self):
+        self.assertEqual(detect_product_area("We need an eval for our payment extraction model"), "payments")
+        self.assertEqual(detect_product_area("KYC and sanctions screening"), "compliance")
+        self.assertEqual(detect_product_area("A chatbot for support tickets"), "support")
+
+    def test_no_keywords_means_no_area(self):
+        self.assertIsNone(detect_product_area("Help me write an eval"))
+
+    def test_only_matching_section_is_appended(self):
+        appendix = phase_appendix("manage", "", "lending")
+        self.assertIn(DOMAIN_KNOWLEDGE["lending"], appendix)
+        self.assertNotIn(DOMAIN_KNOWLEDGE["fraud"], appendix)
+        self.assertNotIn(DOMAIN_KNOWLEDGE["lending"], SYSTEM_PROMPT)
+
+
+if __name__ == "__main__":
+    unittest.main()